@@ -16,6 +16,21 @@ import os
 
 load_dotenv()
 FERNET_KEY = os.getenv("FERNET_KEY")
+# Claves versionadas para rotación: "id:clave,id:clave", la primera es la activa.
+# Sin FERNET_KEYS se usa FERNET_KEY con id "0".
+FERNET_KEYS = [
+    tuple(item.strip().split(':', 1)) for item in os.getenv("FERNET_KEYS", "").split(',') if item.strip()
+] or [("0", FERNET_KEY)]
+
+# Backend con el que se cifran las entradas nuevas. Las filas de cualquier otro
+# backend se siguen descifrando (cada token lleva su versión de formato).
+# Opciones: backend.ciphers.AESGCMCipher, ChaCha20Cipher, FernetCipher
+PASSWORD_CIPHER_BACKEND = os.getenv("PASSWORD_CIPHER_BACKEND", "backend.ciphers.AESGCMCipher")
+
+# Cifrado en sobre: cada usuario cifra sus entradas con su propia clave de datos
+ENVELOPE_ENCRYPTION = os.getenv("ENVELOPE_ENCRYPTION", "false").lower() == "true"
+DATA_KEY_CACHE_MAX_ENTRIES = int(os.getenv("DATA_KEY_CACHE_MAX_ENTRIES", 1024))
+DATA_KEY_CACHE_TTL = int(os.getenv("DATA_KEY_CACHE_TTL", 300))  # segundos
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +63,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero para medir la petición completa; solo se carga con REQUEST_PROFILING
+    'backend.profiling.RequestProfilingMiddleware',
+    'backend.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,8 +83,85 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'backend.authentication.StatelessJWTAuthentication',
+    ),
+    # Límites de login por IP y por cuenta (backend/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv("LOGIN_RATE_PER_IP", "30/min"),
+        'login_account': os.getenv("LOGIN_RATE_PER_ACCOUNT", "10/min"),
+    },
+    # Proxies de confianza delante de la app. Con 0 la IP es REMOTE_ADDR y se ignora
+    # X-Forwarded-For, que el cliente puede inventarse para saltarse el límite por IP;
+    # con N se toma la N-ésima dirección de X-Forwarded-For empezando por el final.
+    'NUM_PROXIES': int(os.getenv("NUM_PROXIES", 0)),
+}
+
+# Estado de los tokens (versión, activo) cacheado por usuario: una revocación
+# tarda como mucho TOKEN_STATE_CACHE_TTL segundos en llegar a otros procesos
+TOKEN_STATE_CACHE_TTL = int(os.getenv("TOKEN_STATE_CACHE_TTL", 30))
+TOKEN_STATE_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_STATE_CACHE_MAX_ENTRIES", 10000))
+
+# Paginación por cursor del listado de contraseñas
+PASSWORD_ENTRY_PAGE_SIZE = int(os.getenv("PASSWORD_ENTRY_PAGE_SIZE", 50))
+PASSWORD_ENTRY_MAX_PAGE_SIZE = int(os.getenv("PASSWORD_ENTRY_MAX_PAGE_SIZE", 500))
+
+# Cifrado por lotes: a partir de este tamaño se reparte en un pool de hilos
+CRYPTO_PARALLEL_THRESHOLD = int(os.getenv("CRYPTO_PARALLEL_THRESHOLD", 256))
+CRYPTO_MAX_WORKERS = int(os.getenv("CRYPTO_MAX_WORKERS", 0))  # 0 = os.cpu_count()
+
+# Máximo de operaciones por petición al endpoint bulk
+PASSWORD_BULK_MAX_OPERATIONS = int(os.getenv("PASSWORD_BULK_MAX_OPERATIONS", 5000))
+
+# Filas leídas y descifradas por bloque al exportar la bóveda
+PASSWORD_EXPORT_CHUNK_SIZE = int(os.getenv("PASSWORD_EXPORT_CHUNK_SIZE", 1000))
+
+# Caché en memoria de contraseñas descifradas (desactivada por defecto)
+DECRYPTED_CACHE_ENABLED = os.getenv("DECRYPTED_CACHE_ENABLED", "false").lower() == "true"
+DECRYPTED_CACHE_MAX_ENTRIES = int(os.getenv("DECRYPTED_CACHE_MAX_ENTRIES", 1024))
+DECRYPTED_CACHE_TTL = int(os.getenv("DECRYPTED_CACHE_TTL", 30))  # segundos
+
+# Margen (segundos) que se resta a la marca de agua de /passwords/changes/ para
+# no perder escrituras que confirmaron tarde; el cliente puede recibir duplicados.
+PASSWORD_SYNC_WATERMARK_LAG = int(os.getenv("PASSWORD_SYNC_WATERMARK_LAG", 5))
+# Cambios por página de /passwords/changes/ (?page_size= hasta PASSWORD_ENTRY_MAX_PAGE_SIZE)
+PASSWORD_SYNC_PAGE_SIZE = int(os.getenv("PASSWORD_SYNC_PAGE_SIZE", 200))
+# Días que se guardan las lápidas de borrado (manage.py prune_tombstones). Una marca
+# de agua más antigua ya no garantiza ver todos los borrados: el cliente resincroniza.
+PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS", 90))
+
+
+# Perfilado por petición: consultas SQL, tiempo de BD y de cifrado en la cabecera
+# Server-Timing y en el log "backend.profiling" (una línea JSON por petición)
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "false").lower() == "true"
+
+# Métricas en proceso expuestas en /metrics (formato Prometheus). Desactivadas
+# por defecto; al activarlas METRICS_TOKEN es obligatorio y el endpoint exige
+# "Authorization: Bearer <token>" (el check backend.E001 falla si falta).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Cachés locales al proceso. Las ventanas de login van aparte para que limpiar
+# la caché por defecto no las reinicie.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'login_throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'login-throttle',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv("LOGIN_THROTTLE_MAX_ENTRIES", 100000))},
+    },
 }
 
 
@@ -101,17 +196,84 @@ WSGI_APPLICATION = 'BackendEncrypt.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Perfil de base de datos por entorno: DB_ENGINE=postgresql para producción,
+# sqlite (por defecto) para instalaciones de un solo nodo.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    # Requiere psycopg[pool]. Con el pool nativo de Django 5 las conexiones se
+    # reutilizan desde el pool y CONN_MAX_AGE tiene que ser 0; sin pool se usan
+    # conexiones persistentes con comprobación de salud.
+    DB_POOL = os.getenv("DB_POOL", "true").lower() == "true"
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("POSTGRES_DB", "vault"),
+            'USER': os.getenv("POSTGRES_USER", "vault"),
+            'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+            'HOST': os.getenv("POSTGRES_HOST", "localhost"),
+            'PORT': os.getenv("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", 60)),
+            'CONN_HEALTH_CHECKS': not DB_POOL,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+                    'max_size': int(os.getenv("DB_POOL_MAX_SIZE", 20)),
+                    'timeout': float(os.getenv("DB_POOL_TIMEOUT", 10)),  # espera máx. por una conexión
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    # SQLite ajustado: WAL deja leer mientras se escribe, las transacciones piden
+    # el lock de escritura al empezar (IMMEDIATE) y las escrituras concurrentes
+    # esperan su turno hasta DB_SQLITE_TIMEOUT segundos en vez de fallar con
+    # "database is locked".
+    DB_SQLITE_TIMEOUT = int(os.getenv("DB_SQLITE_TIMEOUT", 20))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': DB_SQLITE_TIMEOUT,
+                'init_command': ';'.join([
+                    'PRAGMA journal_mode=WAL',
+                    'PRAGMA synchronous=NORMAL',
+                    f'PRAGMA busy_timeout={DB_SQLITE_TIMEOUT * 1000}',
+                    f'PRAGMA mmap_size={int(os.getenv("DB_SQLITE_MMAP_SIZE", 268435456))}',  # 256 MiB
+                    'PRAGMA temp_store=MEMORY',
+                    f'PRAGMA cache_size=-{int(os.getenv("DB_SQLITE_CACHE_KIB", 65536))}',  # 64 MiB
+                ]),
+            },
+        }
     }
-}
 
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Hash de contraseñas: Argon2id con costes ajustables (memoria en KiB). Los
+# hashes con otros costes o con PBKDF2 se re-hashean en el siguiente login.
+PASSWORD_HASHERS = [
+    'backend.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", 65536))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 2))
+
+# La verificación en el login corre en un pool acotado (0 = núm. de CPUs); con la
+# cola llena durante PASSWORD_HASH_QUEUE_TIMEOUT segundos se responde 503
+AUTHENTICATION_BACKENDS = ['backend.hashers.PooledHashBackend']
+PASSWORD_HASH_MAX_WORKERS = int(os.getenv("PASSWORD_HASH_MAX_WORKERS", 0))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 64))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
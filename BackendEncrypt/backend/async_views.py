@@ -0,0 +1,168 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aauthenticate
+from django.contrib.auth.models import update_last_login
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import (
+    ClaimsUser, StatelessJWTAuthentication, aget_token_state, check_token_state, user_id_from_token,
+)
+from .hashers import HashingBusy
+from .models import PasswordEntry, User
+from .throttling import login_throttle_wait
+from .pagination import PasswordEntryCursorPagination
+from .serializer import CustomTokenObtainPairSerializer, PasswordEntryMetadataSerializer, PasswordEntrySerializer
+from .cache import adecrypt_entries
+
+# Vistas async nativas para ASGI: ORM async, JWT async y cifrado en el pool acotado.
+# Misma forma de respuesta que PasswordEntryViewSet.
+
+_jwt = StatelessJWTAuthentication()
+
+
+def _error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+async def authenticate(request):
+    """Equivalente async de StatelessJWTAuthentication.authenticate. Devuelve el usuario o None."""
+    header = _jwt.get_header(request)
+    if header is None:
+        return None
+    raw_token = _jwt.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = _jwt.get_validated_token(raw_token)
+    user = ClaimsUser(validated_token)
+    return check_token_state(user, await aget_token_state(user_id_from_token(validated_token)))
+
+
+def jwt_required(view):
+    async def wrapped(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except (InvalidToken, AuthenticationFailed) as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            return JsonResponse(detail, status=exc.status_code)
+        if user is None:
+            return _error("Authentication credentials were not provided.", 401)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return csrf_exempt(wrapped)
+
+
+async def _serialize(entries, metadata=False):
+    data = PasswordEntryMetadataSerializer(entries, many=True).data
+    if not metadata:
+        plain = await adecrypt_entries(entries)
+        for row, password in zip(data, plain):
+            row['decrypted_password'] = password
+    return data
+
+
+def _parse_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+async def _save(entry, validated_data):
+    raw_password = validated_data.pop('raw_password', None)
+    for attr, value in validated_data.items():
+        setattr(entry, attr, value)
+    if raw_password:
+        await PasswordEntry.aset_passwords([entry], [raw_password])
+    await entry.asave()
+    return (await _serialize([entry]))[0]
+
+
+@jwt_required
+async def entry_list(request):
+    entries_qs = PasswordEntry.objects.filter(user_id=request.user.pk)
+
+    if request.method == 'GET':
+        # Mismo paginador que PasswordEntryViewSet: next/previous son las mismas URLs con ?cursor=
+        paginator = PasswordEntryCursorPagination()
+        try:
+            page_qs = paginator.page_queryset(entries_qs, Request(request))
+        except NotFound as exc:
+            return _error(exc.detail, exc.status_code)
+        page = paginator.set_page([e async for e in page_qs])
+        return JsonResponse({
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': await _serialize(page, metadata=request.GET.get('mode') == 'metadata'),
+        })
+
+    if request.method == 'POST':
+        serializer = PasswordEntrySerializer(data=_parse_body(request))
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        entry = PasswordEntry(user_id=request.user.pk)
+        return JsonResponse(await _save(entry, dict(serializer.validated_data)), status=201)
+
+    return _error(f'Method "{request.method}" not allowed.', 405)
+
+
+@jwt_required
+async def entry_detail(request, pk):
+    try:
+        entry = await PasswordEntry.objects.aget(user_id=request.user.pk, pk=pk)
+    except PasswordEntry.DoesNotExist:
+        return _error("No PasswordEntry matches the given query.", 404)
+
+    if request.method == 'GET':
+        return JsonResponse((await _serialize([entry], metadata=request.GET.get('mode') == 'metadata'))[0])
+
+    if request.method in ('PUT', 'PATCH'):
+        serializer = PasswordEntrySerializer(entry, data=_parse_body(request), partial=request.method == 'PATCH')
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        return JsonResponse(await _save(entry, dict(serializer.validated_data)))
+
+    if request.method == 'DELETE':
+        await entry.adelete()
+        return HttpResponse(status=204)
+
+    return _error(f'Method "{request.method}" not allowed.', 405)
+
+
+@csrf_exempt
+async def token_obtain(request):
+    """Login async: misma respuesta que CustomTokenObtainPairView, Argon2 en el pool de hash."""
+    if request.method != 'POST':
+        return _error(f'Method "{request.method}" not allowed.', 405)
+    # Solo JSON, como el parser de la vista DRF; el cuerpo se lee una vez
+    if request.content_type != 'application/json':
+        return _error(f'Unsupported media type "{request.content_type}" in request.', 415)
+    body = _parse_body(request)
+    if not isinstance(body, dict) or not body.get(User.USERNAME_FIELD) or not body.get('password'):
+        return _error("Email and password are required.", 400)
+
+    wait = login_throttle_wait(request, body)
+    if wait is not None:
+        response = _error("Request was throttled.", 429)
+        response['Retry-After'] = str(int(wait) + 1)
+        return response
+
+    try:
+        user = await aauthenticate(
+            request, **{User.USERNAME_FIELD: body[User.USERNAME_FIELD], 'password': body['password']}
+        )
+    except HashingBusy as exc:
+        return _error(exc.detail, exc.status_code)
+    if user is None:
+        return _error("No active account found with the given credentials", 401)
+
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    if jwt_settings.UPDATE_LAST_LOGIN:
+        await sync_to_async(update_last_login)(None, user)
+    return JsonResponse({'refresh': str(refresh), 'access': str(refresh.access_token)})
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .metrics import record_auth_failure
+from .models import User
+
+# JWT sin estado: el usuario de la petición se construye con los claims que añade
+# CustomTokenObtainPairSerializer.get_token, sin leer la fila de User. Lo único que
+# se consulta es (token_version, is_active), cacheado por usuario unos segundos:
+# desactivar a un usuario o revocar sus tokens (revoke_tokens) corta el acceso en
+# este proceso al instante y en el resto en como mucho TOKEN_STATE_CACHE_TTL.
+
+TOKEN_VERSION_CLAIM = 'tv'
+
+
+class TokenStateCache:
+    def __init__(self):
+        self._data = OrderedDict()  # user_id -> (expira, (token_version, is_active))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return item[1]
+            self._data.pop(user_id, None)
+            self.misses += 1
+            return None
+
+    def set(self, user_id, state):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + settings.TOKEN_STATE_CACHE_TTL, state)
+            self._data.move_to_end(user_id)
+            while len(self._data) > settings.TOKEN_STATE_CACHE_MAX_ENTRIES:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+
+token_state_cache = TokenStateCache()
+
+# Usuario borrado: ninguna versión de token es válida
+_MISSING = (None, False)
+
+
+def get_token_state(user_id):
+    state = token_state_cache.get(user_id)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list('token_version', 'is_active').first() or _MISSING
+        token_state_cache.set(user_id, state)
+    return state
+
+async def aget_token_state(user_id):
+    state = token_state_cache.get(user_id)
+    if state is None:
+        state = await User.objects.filter(pk=user_id).values_list('token_version', 'is_active').afirst() or _MISSING
+        token_state_cache.set(user_id, state)
+    return state
+
+
+def revoke_tokens(user_id):
+    """Invalida todos los tokens emitidos hasta ahora para el usuario."""
+    User.objects.filter(pk=user_id).update(token_version=F('token_version') + 1)
+    token_state_cache.invalidate(user_id)
+
+
+class ClaimsUser(TokenUser):
+    """Usuario de solo lectura construido con los claims del token."""
+
+    @property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+    @property
+    def token_version(self):
+        # Los tokens anteriores a este claim cuentan como versión 0
+        return self.token.get(TOKEN_VERSION_CLAIM, 0)
+
+
+def user_id_from_token(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("Token contained no recognizable user identification")
+
+
+def check_token_state(user, state):
+    token_version, is_active = state
+    if token_version is None:
+        reason, detail = "user_not_found", "User not found"
+    elif not is_active:
+        reason, detail = "user_inactive", "User is inactive"
+    elif user.token_version != token_version:
+        reason, detail = "token_revoked", "Token has been revoked"
+    else:
+        return user
+    record_auth_failure(reason)
+    raise AuthenticationFailed(detail, code=reason)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        try:
+            return super().get_validated_token(raw_token)
+        except InvalidToken:
+            record_auth_failure('invalid_token')
+            raise
+
+    def get_user(self, validated_token):
+        user = ClaimsUser(validated_token)
+        return check_token_state(user, get_token_state(user_id_from_token(validated_token)))
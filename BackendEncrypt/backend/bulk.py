@@ -0,0 +1,210 @@
+import csv
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import decrypted_cache
+from .models import PasswordEntry
+from .search import index_entries
+from .serializer import PasswordEntrySerializer
+from .sync import defer_tombstones, record_tombstones
+
+BULK_BATCH_SIZE = 500
+
+# Nombres de columna de otros gestores (Bitwarden, Chrome, Firefox...) -> campo propio
+IMPORT_ALIASES = {
+    'title': 'title', 'name': 'title',
+    'username': 'username', 'login': 'username', 'login_username': 'username',
+    'password': 'raw_password', 'raw_password': 'raw_password', 'login_password': 'raw_password',
+    'url': 'service_url', 'service_url': 'service_url', 'login_uri': 'service_url',
+    'notes': 'notes', 'extra': 'notes',
+}
+
+
+def bulk_create_entries(user_id, rows):
+    """Cifra en lote y guarda con bulk_create. rows: dicts validados con raw_password."""
+    entries = []
+    for row in rows:
+        data = dict(row)
+        data.pop('raw_password')
+        entry = PasswordEntry(user_id=user_id, **data)
+        entry.refresh_service_domain()
+        entries.append(entry)
+    PasswordEntry.set_passwords(entries, [row['raw_password'] for row in rows])
+    # bulk_create no dispara señales: el índice de búsqueda se actualiza aquí
+    created = PasswordEntry.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+    index_entries(created)
+    return created
+
+
+def _validate(user_id, operations):
+    """Valida todas las operaciones de una vez. Devuelve (planes, resultados con errores)."""
+    ids = [op.get('id') for op in operations if op.get('op') in ('update', 'delete')]
+    existing = PasswordEntry.objects.filter(user_id=user_id).in_bulk(
+        [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+    )
+
+    plans, results, seen = [], [], set()
+    for index, op in enumerate(operations):
+        kind = op.get('op')
+        data = {key: value for key, value in op.items() if key not in ('op', 'id')}
+        result = {'index': index, 'op': kind}
+        results.append(result)
+
+        if kind == 'create':
+            serializer = PasswordEntrySerializer(data=data)
+        elif kind in ('update', 'delete'):
+            pk = op.get('id')
+            # Un id que no es entero (lista, objeto, texto...) ni se puede buscar ni comparar
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                result.update(status=400, errors={'id': ['A valid integer is required.']})
+                continue
+            if pk in seen:
+                result.update(status=400, errors={'id': ['Duplicated id in the same request.']})
+                continue
+            seen.add(pk)
+            instance = existing.get(pk)
+            if instance is None:
+                result.update(id=pk, status=404, errors={'id': ['Not found.']})
+                continue
+            if kind == 'delete':
+                plans.append((result, kind, instance, None))
+                continue
+            serializer = PasswordEntrySerializer(instance, data=data, partial=True)
+        else:
+            result.update(status=400, errors={'op': ["Must be 'create', 'update' or 'delete'."]})
+            continue
+
+        if serializer.is_valid():
+            plans.append((result, kind, serializer.instance, serializer.validated_data))
+        else:
+            result.update(status=400, errors=serializer.errors)
+
+    return plans, results
+
+
+def apply_operations(user_id, operations):
+    """
+    Aplica una lista de operaciones create/update/delete en una sola transacción.
+    Si alguna no es válida no se guarda nada y solo las inválidas llevan status.
+    Devuelve (ok, resultados por operación).
+    """
+    plans, results = _validate(user_id, operations)
+    if any('errors' in result for result in results):
+        return False, results
+
+    creates = [(result, data) for result, kind, _, data in plans if kind == 'create']
+    updates = [(result, instance, data) for result, kind, instance, data in plans if kind == 'update']
+    deletes = [(result, instance) for result, kind, instance, _ in plans if kind == 'delete']
+
+    with transaction.atomic():
+        if creates:
+            created = bulk_create_entries(user_id, [data for _, data in creates])
+            for (result, _), entry in zip(creates, created):
+                result.update(id=entry.pk, status=201)
+
+        if updates:
+            # bulk_update no dispara auto_now: updated_at se fija a mano
+            now = timezone.now()
+            fields = {'updated_at'}
+            with_password = [(instance, data['raw_password']) for _, instance, data in updates if data.get('raw_password')]
+            if with_password:
+                PasswordEntry.set_passwords(
+                    [instance for instance, _ in with_password], [raw for _, raw in with_password]
+                )
+                fields.update(('encrypted_pass', 'key_id'))
+            for result, instance, data in updates:
+                for attr, value in data.items():
+                    if attr != 'raw_password':
+                        setattr(instance, attr, value)
+                        fields.add(attr)
+                if 'service_url' in data:
+                    instance.refresh_service_domain()
+                    fields.add('service_domain')
+                instance.updated_at = now
+                decrypted_cache.invalidate(instance.pk)
+                result.update(id=instance.pk, status=200)
+            instances = [instance for _, instance, _ in updates]
+            PasswordEntry.objects.bulk_update(instances, sorted(fields), batch_size=BULK_BATCH_SIZE)
+            index_entries(instances)
+
+        if deletes:
+            deleted_ids = [instance.pk for _, instance in deletes]
+            with defer_tombstones():
+                PasswordEntry.objects.filter(user_id=user_id, id__in=deleted_ids).delete()
+            record_tombstones(user_id, deleted_ids)
+            for result, instance in deletes:
+                result.update(id=instance.pk, status=204)
+
+    return True, results
+
+
+class InvalidRecord:
+    """Registro que no se pudo leer (JSON mal formado, no es un objeto...): se omite y se informa."""
+
+    def __init__(self, message):
+        self.errors = {'non_field_errors': [message]}
+
+
+def _parse_ndjson(stream):
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield InvalidRecord(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRecord(f"Expected a JSON object, got {type(record).__name__}.")
+            continue
+        yield record
+
+
+def _parse_csv(stream):
+    records = csv.DictReader(stream)
+    while True:
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield InvalidRecord(f"Invalid CSV: {exc}")
+            continue
+        yield record
+
+
+def iter_import_records(stream, fmt):
+    """
+    Lee un fichero NDJSON o CSV registro a registro, con los campos ya renombrados.
+    Los registros ilegibles salen como InvalidRecord para no cortar la importación.
+    """
+    records = _parse_csv(stream) if fmt == 'csv' else _parse_ndjson(stream)
+    for record in records:
+        if isinstance(record, InvalidRecord):
+            yield record
+            continue
+        row = {}
+        for key, value in record.items():
+            field = IMPORT_ALIASES.get(key.strip().lower()) if isinstance(key, str) else None
+            if field and value not in (None, '') and field not in row:
+                row[field] = value
+        yield row
+
+
+def validate_import_rows(rows):
+    """Valida las filas como lo haría la API. Devuelve (válidas, [(posición, errores)])."""
+    valid, errors = [], []
+    for position, row in enumerate(rows):
+        if isinstance(row, InvalidRecord):
+            errors.append((position, row.errors))
+            continue
+        serializer = PasswordEntrySerializer(data=row)
+        if serializer.is_valid():
+            data = dict(serializer.validated_data)
+            data['notes'] = row.get('notes', '')
+            valid.append(data)
+        else:
+            errors.append((position, serializer.errors))
+    return valid, errors
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .utils import adecrypt_many, decrypt_many
+
+
+# Caché LRU en memoria de contraseñas descifradas, por proceso y opcional
+# (DECRYPTED_CACHE_ENABLED). Clave lógica (entry_id, updated_at): si la entrada
+# cambia, su updated_at también y la versión anterior deja de servir.
+class DecryptedCache:
+    def __init__(self):
+        self._data = OrderedDict()  # entry_id -> (updated_at, expira, bytearray)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return settings.DECRYPTED_CACHE_ENABLED
+
+    def get(self, entry_id, updated_at):
+        with self._lock:
+            item = self._data.get(entry_id)
+            if item is not None:
+                cached_updated_at, expires, value = item
+                if cached_updated_at == updated_at and expires > time.monotonic():
+                    self._data.move_to_end(entry_id)
+                    self.hits += 1
+                    return value.decode()
+                self._discard(entry_id)
+            self.misses += 1
+            return None
+
+    def set(self, entry_id, updated_at, password):
+        with self._lock:
+            self._discard(entry_id)
+            expires = time.monotonic() + settings.DECRYPTED_CACHE_TTL
+            self._data[entry_id] = (updated_at, expires, bytearray(password.encode()))
+            while len(self._data) > settings.DECRYPTED_CACHE_MAX_ENTRIES:
+                self._discard(next(iter(self._data)))
+
+    def invalidate(self, entry_id):
+        with self._lock:
+            self._discard(entry_id)
+
+    def clear(self):
+        with self._lock:
+            for entry_id in list(self._data):
+                self._discard(entry_id)
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+    def _discard(self, entry_id):
+        item = self._data.pop(entry_id, None)
+        if item is not None:
+            # Sobrescribe el secreto antes de soltarlo
+            value = item[2]
+            value[:] = bytes(len(value))
+
+
+decrypted_cache = DecryptedCache()
+
+
+def _lookup(entries):
+    """Devuelve (contraseñas con None en los fallos, índices que hay que descifrar)."""
+    if not decrypted_cache.enabled:
+        return [None] * len(entries), list(range(len(entries)))
+    plain = [decrypted_cache.get(entry.pk, entry.updated_at) for entry in entries]
+    return plain, [i for i, password in enumerate(plain) if password is None]
+
+
+def _store(entries, plain, missing, decrypted):
+    for i, password in zip(missing, decrypted):
+        plain[i] = password
+        if decrypted_cache.enabled:
+            decrypted_cache.set(entries[i].pk, entries[i].updated_at, password)
+    return plain
+
+
+def _missing_items(entries, missing):
+    from .keys import data_keys_for
+    key_ids = [entries[i].key_id for i in missing]
+    data_keys = data_keys_for((entries[i].key_id, entries[i].user_id) for i in missing)
+    return [entries[i].encrypted_pass for i in missing], key_ids, data_keys
+
+
+def decrypt_entries(entries):
+    """Descifra una lista de PasswordEntry pasando por la caché; los fallos van en un lote."""
+    plain, missing = _lookup(entries)
+    decrypted = decrypt_many(*_missing_items(entries, missing)) if missing else []
+    return _store(entries, plain, missing, decrypted)
+
+
+async def adecrypt_entries(entries):
+    plain, missing = _lookup(entries)
+    if missing:
+        decrypted = await adecrypt_many(*await sync_to_async(_missing_items)(entries, missing))
+    else:
+        decrypted = []
+    return _store(entries, plain, missing, decrypted)
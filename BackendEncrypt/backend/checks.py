@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.security, deploy=False)
+def metrics_token_check(app_configs, **kwargs):
+    # /metrics expone rutas, fallos de login y estado de las cachés: nunca sin token
+    if settings.METRICS_ENABLED and not settings.METRICS_TOKEN:
+        return [Error(
+            'METRICS_ENABLED requiere METRICS_TOKEN.',
+            hint='Define METRICS_TOKEN o desactiva las métricas con METRICS_ENABLED=false.',
+            id='backend.E001',
+        )]
+    return []
@@ -0,0 +1,132 @@
+import base64
+import os
+from abc import ABC, abstractmethod
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Backends de cifrado. Todos reciben una clave en formato Fernet (32 bytes en
+# base64 urlsafe) y trabajan con tokens binarios cuyo primer byte es la versión
+# del formato: 0x80 en Fernet, 0x02 en AES-GCM, 0x03 en ChaCha20-Poly1305. Así
+# las filas antiguas se descifran aunque el backend activo
+# (settings.PASSWORD_CIPHER_BACKEND) sea otro. decrypt acepta cualquier objeto
+# bytes-like (memoryview de un BinaryField incluido) sin copiarlo.
+
+
+class BaseCipher(ABC):
+    version = None
+
+    @abstractmethod
+    def __init__(self, key: bytes):
+        """key: clave en formato Fernet."""
+
+    @abstractmethod
+    def encrypt(self, data: bytes) -> bytes:
+        """Token binario que empieza por el byte de versión."""
+
+    @abstractmethod
+    def decrypt(self, token) -> bytes:
+        """Acepta cualquier bytes-like; InvalidToken si no es de esta clave o versión."""
+
+
+class FernetCipher(BaseCipher):
+    """AES-128-CBC + HMAC-SHA256 con marca de tiempo. Formato histórico."""
+
+    version = 0x80
+
+    def __init__(self, key: bytes):
+        self._fernet = Fernet(key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(self._fernet.encrypt(data))
+
+    def decrypt(self, token) -> bytes:
+        # Fernet solo acepta su forma en base64
+        return self._fernet.decrypt(base64.urlsafe_b64encode(token))
+
+
+class AEADCipher(BaseCipher):
+    """AEAD de una pasada: version (1) | nonce (12) | texto cifrado + tag (16)."""
+
+    algorithm = None
+    info = None
+
+    def __init__(self, key: bytes):
+        # Subclave de 256 bits derivada de la clave Fernet, distinta por algoritmo
+        raw = base64.urlsafe_b64decode(key)
+        derived = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=self.info).derive(raw)
+        self._aead = self.algorithm(derived)
+        self._prefix = bytes([self.version])
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(12)
+        return self._prefix + nonce + self._aead.encrypt(nonce, data, None)
+
+    def decrypt(self, token) -> bytes:
+        token = memoryview(token)
+        if len(token) < 29 or token[0] != self.version:
+            raise InvalidToken
+        try:
+            return self._aead.decrypt(token[1:13], token[13:], None)
+        except InvalidTag as exc:
+            raise InvalidToken from exc
+
+
+class AESGCMCipher(AEADCipher):
+    version = 0x02
+    algorithm = AESGCM
+    info = b'password-entry/aes-256-gcm'
+
+
+class ChaCha20Cipher(AEADCipher):
+    version = 0x03
+    algorithm = ChaCha20Poly1305
+    info = b'password-entry/chacha20-poly1305'
+
+
+CIPHER_BACKENDS = (FernetCipher, AESGCMCipher, ChaCha20Cipher)
+
+
+def token_version(token):
+    """Versión del formato de un token: su primer byte."""
+    return token[0] if len(token) else None
+
+
+class VersionedCipher:
+    """Una clave, todos los formatos: cifra con el backend activo y descifra según la versión."""
+
+    def __init__(self, key: bytes, backend=None):
+        backend = backend or import_string(settings.PASSWORD_CIPHER_BACKEND)
+        self._key = key
+        self._backends = {}
+        self._encryptor = self._backend(backend.version, backend)
+
+    def _backend(self, version, backend=None):
+        cipher = self._backends.get(version)
+        if cipher is None:
+            backend = backend or next((b for b in CIPHER_BACKENDS if b.version == version), None)
+            if backend is None:
+                raise InvalidToken
+            cipher = self._backends[version] = backend(self._key)
+        return cipher
+
+    @property
+    def version(self):
+        return self._encryptor.version
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._encryptor.encrypt(data)
+
+    def decrypt(self, token) -> bytes:
+        return self._backend(token_version(token)).decrypt(token)
+
+
+def make_cipher(key) -> VersionedCipher:
+    if isinstance(key, str):
+        key = key.encode()
+    return VersionedCipher(key)
@@ -0,0 +1,27 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+# Validadores HTTP (ETag / Last-Modified) calculados sin cargar ni descifrar filas.
+
+def make_etag(*parts):
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def not_modified(request, etag, last_modified):
+    """Devuelve la respuesta 304/412 si las precondiciones de la petición lo piden, o None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    # La respuesta depende del usuario autenticado
+    patch_vary_headers(response, ('Authorization',))
+    return response
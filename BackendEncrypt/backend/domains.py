@@ -0,0 +1,49 @@
+import ipaddress
+import re
+from urllib.parse import urlsplit
+
+import tldextract
+
+# Public Suffix List completa, con los sufijos privados (github.io, herokuapp.com,
+# blogspot.com...): cada inquilino de esos servicios es un sitio distinto y el
+# autocompletado no debe mezclar sus credenciales. Se usa la copia que trae
+# tldextract, sin descargas en tiempo de ejecución; se actualiza con el paquete.
+_extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, include_psl_private_domains=True)
+
+WEB_SCHEMES = {'http', 'https'}
+# 'esquema:' al principio; 'host:puerto' sin esquema no cuenta
+_SCHEME = re.compile(r'^([a-z][a-z0-9+.-]*):(?!\d+(?:[/?#]|$))', re.IGNORECASE)
+
+
+def registrable_domain(url):
+    """
+    'https://mail.google.com/x' -> 'google.com'. Cadena vacía si no es un origen web:
+    sin host, con esquema distinto de http(s) (javascript:, mailto:...) o si el host
+    es solo un sufijo público (co.uk, github.io), que no identifica ningún sitio.
+    """
+    if not url:
+        return ''
+    url = url.strip()
+    scheme = _SCHEME.match(url)
+    if scheme and scheme.group(1).lower() not in WEB_SCHEMES:
+        return ''
+    if '//' not in url:
+        url = f'//{url}'
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+    host = host.rstrip('.')
+    if not host:
+        return ''
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    parts = _extract(host)
+    if parts.suffix and not parts.domain:
+        return ''
+    # Hosts sin sufijo público (localhost, nombres internos): tal cual
+    return parts.top_domain_under_public_suffix or host
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .keys import data_keys_for
+from .utils import chunked, decrypt_many
+
+EXPORT_FIELDS = ('id', 'title', 'username', 'service_url', 'notes', 'created_at', 'updated_at')
+
+
+def iter_export_chunks(queryset, chunk_size=None):
+    """Lee la bóveda por bloques y descifra cada bloque en lote; nunca la carga entera."""
+    chunk_size = chunk_size or settings.PASSWORD_EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values(
+        *EXPORT_FIELDS, 'encrypted_pass', 'key_id', 'user_id'
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        data_keys = data_keys_for((row['key_id'], row.pop('user_id')) for row in chunk)
+        plain = decrypt_many(
+            [row.pop('encrypted_pass') for row in chunk], [row.pop('key_id') for row in chunk], data_keys
+        )
+        for row, password in zip(chunk, plain):
+            row['password'] = password
+        yield chunk
+
+
+def stream_ndjson(queryset, chunk_size=None):
+    encoder = DjangoJSONEncoder()
+    for chunk in iter_export_chunks(queryset, chunk_size):
+        yield ''.join(encoder.encode(row) + '\n' for row in chunk)
+
+
+def stream_json(queryset, chunk_size=None):
+    # Array JSON emitido por trozos: '[' + filas separadas por comas + ']'
+    encoder = DjangoJSONEncoder()
+    yield '['
+    separator = ''
+    for chunk in iter_export_chunks(queryset, chunk_size):
+        yield separator + ','.join(encoder.encode(row) for row in chunk)
+        separator = ','
+    yield ']'
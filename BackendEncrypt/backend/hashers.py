@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, Argon2PasswordHasher, make_password, verify_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .metrics import record_auth_failure
+
+# Hash de contraseñas de login: Argon2id con costes configurables y verificación
+# en un pool propio y acotado. Así una avalancha de logins no acapara la CPU ni
+# la memoria de los hilos que atienden el resto de peticiones.
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id con los costes de settings.PASSWORD_ARGON2_*.
+
+    Mantiene el nombre de algoritmo "argon2": al cambiar los costes, must_update
+    detecta los hashes antiguos y se re-hashean en el siguiente login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Demasiados inicios de sesión simultáneos, reintenta en unos segundos.'
+    default_code = 'login_busy'
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def hash_workers() -> int:
+    return settings.PASSWORD_HASH_MAX_WORKERS or os.cpu_count() or 4
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=hash_workers(), thread_name_prefix='hash')
+            # Hilos ocupados + cola máxima; por encima se rechaza con 503
+            _slots = threading.BoundedSemaphore(hash_workers() + settings.PASSWORD_HASH_QUEUE_SIZE)
+    return _executor
+
+
+def _acquire_slot():
+    get_hash_executor()
+    if not _slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        record_auth_failure('login_busy')
+        raise HashingBusy()
+
+
+def run_hashing(func, *args):
+    """Ejecuta func (solo CPU, sin base de datos) en el pool de hash y espera el resultado."""
+    _acquire_slot()
+    try:
+        return _executor.submit(func, *args).result()
+    finally:
+        _slots.release()
+
+async def arun_hashing(func, *args):
+    # La espera por un hueco tampoco debe bloquear el event loop
+    await asyncio.to_thread(_acquire_slot)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _slots.release()
+
+
+class PooledHashBackend(ModelBackend):
+    """ModelBackend que verifica y re-hashea en el pool; la base de datos queda en el hilo de la petición."""
+
+    def _users(self, username, kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        return UserModel._default_manager.filter(**{UserModel.USERNAME_FIELD: username})
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+        user = self._users(username, kwargs).first()
+        # Sin usuario se pasa un hash inutilizable: verify_password hace entonces un hash
+        # de relleno (mismo tiempo de respuesta). Con None fallaría en identify_hasher.
+        is_correct, must_update = run_hashing(verify_password, password, user.password if user else UNUSABLE_PASSWORD_PREFIX)
+        if not is_correct:
+            record_auth_failure('bad_credentials')
+            return None
+        if must_update:
+            user.password = run_hashing(make_password, password)
+            user.save(update_fields=['password'])
+        return user if self.user_can_authenticate(user) else None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+        user = await self._users(username, kwargs).afirst()
+        is_correct, must_update = await arun_hashing(verify_password, password, user.password if user else UNUSABLE_PASSWORD_PREFIX)
+        if not is_correct:
+            record_auth_failure('bad_credentials')
+            return None
+        if must_update:
+            user.password = await arun_hashing(make_password, password)
+            await user.asave(update_fields=['password'])
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,137 @@
+import base64
+import threading
+import time
+from collections import OrderedDict
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import utils
+from .ciphers import VersionedCipher, make_cipher
+from .models import PasswordEntry, User
+
+# Cifrado en sobre: cada usuario tiene una clave de datos (DEK) propia, guardada
+# en User.wrapped_data_key cifrada con la clave maestra (FERNET_KEYS). Sus entradas
+# llevan key_id = USER_KEY_ID. Rotar la maestra o revocar a un usuario solo
+# re-cifra su DEK, no sus filas.
+
+USER_KEY_ID = 'u'
+
+
+class DataKeyMissing(RuntimeError):
+    """El usuario tiene entradas cifradas con su DEK pero wrapped_data_key está vacío."""
+
+
+# LRU con TTL de DEKs ya desenvueltas, para no descifrarlas en cada petición
+class DataKeyCache:
+    def __init__(self):
+        self._data = OrderedDict()  # user_id -> (expira, VersionedCipher)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return item[1]
+            self._data.pop(user_id, None)
+            self.misses += 1
+            return None
+
+    def set(self, user_id, data_key):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + settings.DATA_KEY_CACHE_TTL, data_key)
+            self._data.move_to_end(user_id)
+            while len(self._data) > settings.DATA_KEY_CACHE_MAX_ENTRIES:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+
+data_key_cache = DataKeyCache()
+
+
+@receiver(setting_changed)
+def _clear_data_key_cache(setting, **kwargs):
+    # Las DEKs cacheadas cifran con el backend que estaba activo al crearlas
+    if setting in ('FERNET_KEY', 'FERNET_KEYS', 'PASSWORD_CIPHER_BACKEND'):
+        data_key_cache.clear()
+
+
+def envelope_enabled():
+    return settings.ENVELOPE_ENCRYPTION
+
+
+# wrapped_data_key es texto: el token binario se guarda en base64
+def _wrap(token: bytes) -> str:
+    return base64.urlsafe_b64encode(token).decode()
+
+def _unwrap(wrapped: str) -> bytes:
+    return base64.urlsafe_b64decode(wrapped)
+
+
+def get_user_data_key(user_id) -> VersionedCipher:
+    """DEK desenvuelta del usuario; la crea la primera vez que hace falta.
+
+    Si ya tiene entradas con key_id = USER_KEY_ID la DEK existió y se ha perdido:
+    una nueva no las descifraría, así que se lanza DataKeyMissing en vez de crearla.
+    """
+    data_key = data_key_cache.get(user_id)
+    if data_key is not None:
+        return data_key
+
+    wrapped = User.objects.filter(pk=user_id).values_list('wrapped_data_key', flat=True).get()
+    if not wrapped:
+        if PasswordEntry.objects.filter(user_id=user_id, key_id=USER_KEY_ID).exists():
+            raise DataKeyMissing(
+                f"User {user_id} has entries encrypted with a data key but wrapped_data_key is empty; "
+                "restore it from a backup instead of generating a new one"
+            )
+        candidate = _wrap(utils.keyring.encrypt(Fernet.generate_key()))
+        # Solo gana una petición si dos la crean a la vez
+        User.objects.filter(pk=user_id, wrapped_data_key='').update(wrapped_data_key=candidate)
+        wrapped = User.objects.filter(pk=user_id).values_list('wrapped_data_key', flat=True).get()
+
+    data_key = make_cipher(utils.keyring.decrypt(_unwrap(wrapped)))
+    data_key_cache.set(user_id, data_key)
+    return data_key
+
+
+def data_keys_for(items):
+    """Para cada (key_id, user_id), la DEK del usuario si la fila usa cifrado en sobre, si no None."""
+    resolved, result = {}, []
+    for key_id, user_id in items:
+        if key_id != USER_KEY_ID:
+            result.append(None)
+            continue
+        if user_id not in resolved:
+            resolved[user_id] = get_user_data_key(user_id)
+        result.append(resolved[user_id])
+    return result
+
+
+def rewrap_user_data_key(user_id):
+    """Re-envuelve la DEK con la clave maestra activa. O(1): las entradas no se tocan."""
+    wrapped = User.objects.filter(pk=user_id).values_list('wrapped_data_key', flat=True).get()
+    if not wrapped:
+        return False
+    User.objects.filter(pk=user_id).update(
+        wrapped_data_key=_wrap(utils.keyring.rotate(_unwrap(wrapped)))
+    )
+    data_key_cache.invalidate(user_id)
+    return True
@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.bulk import bulk_create_entries, iter_import_records, validate_import_rows
+from backend.models import ImportCheckpoint, User
+from backend.utils import chunked
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un fichero NDJSON o CSV (p. ej. exportado de otro gestor) en la bóveda "
+        "de un usuario. Cada bloque se cifra en lote y se confirma en su propia transacción "
+        "junto con el progreso; con --resume se continúa desde el último bloque confirmado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichero a importar ('-' para stdin)")
+        parser.add_argument('--user', required=True, help="Email del dueño de las entradas")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help="Por defecto según la extensión")
+        parser.add_argument('--chunk-size', type=int, default=settings.PASSWORD_EXPORT_CHUNK_SIZE)
+        parser.add_argument('--checkpoint', help="Nombre del progreso guardado (por defecto la ruta absoluta)")
+        parser.add_argument('--resume', action='store_true', help="Salta los registros ya confirmados")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['user']}")
+
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size debe ser positivo")
+
+        checkpoint = options['checkpoint'] or (None if path == '-' else os.path.abspath(path))
+        if options['resume'] and checkpoint is None:
+            raise CommandError("--resume necesita --checkpoint al leer de stdin")
+        done = self._read_checkpoint(user, checkpoint) if options['resume'] else 0
+
+        # utf-8-sig: los CSV exportados desde Excel/Windows empiezan por BOM y, si no se
+        # quita, la primera cabecera llega como '\ufefftitle' y esa columna se pierde
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            stream = open(path, newline='', encoding='utf-8-sig')
+        imported = skipped = 0
+        started = time.monotonic()
+        try:
+            records = iter_import_records(stream, fmt)
+            # Saltar lo confirmado en una ejecución anterior
+            for _ in range(done):
+                if next(records, None) is None:
+                    break
+
+            for chunk in chunked(records, chunk_size):
+                rows, errors = validate_import_rows(chunk)
+                # El progreso se confirma con el bloque: un fallo a medias no deja ni uno sin el otro
+                with transaction.atomic():
+                    bulk_create_entries(user.pk, rows)
+                    self._write_checkpoint(user, checkpoint, done + len(chunk))
+                for position, error in errors:
+                    self.stderr.write(f"Registro {done + position + 1} omitido: {error}")
+
+                done += len(chunk)
+                imported += len(rows)
+                skipped += len(errors)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{done} registros procesados ({imported} importados, {skipped} omitidos, "
+                    f"{imported / elapsed if elapsed else 0:.0f} filas/s)"
+                )
+        finally:
+            if path == '-':
+                # Sin cerrar stdin
+                stream.detach()
+            else:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación terminada: {imported} entradas importadas, {skipped} omitidas"
+        ))
+
+    def _read_checkpoint(self, user, checkpoint):
+        progress = ImportCheckpoint.objects.filter(user=user, name=checkpoint).first()
+        return progress.done if progress else 0
+
+    def _write_checkpoint(self, user, checkpoint, done):
+        if checkpoint is None:
+            return
+        ImportCheckpoint.objects.update_or_create(user=user, name=checkpoint, defaults={'done': done})
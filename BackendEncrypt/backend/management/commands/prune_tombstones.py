@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las lápidas de borrado más antiguas que PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS. "
+        "Los clientes con una marca de agua anterior tendrán que resincronizar desde cero."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Retención en días (por defecto la de settings)")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days']) if options['days'] is not None else None
+        deleted = prune_tombstones(before)
+        self.stdout.write(self.style.SUCCESS(f"{deleted} lápidas borradas"))
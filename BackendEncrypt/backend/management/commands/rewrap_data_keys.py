@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from backend.keys import rewrap_user_data_key
+from backend.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-envuelve las claves de datos de los usuarios con la clave maestra activa "
+        "(la primera de FERNET_KEYS). Las entradas no se re-cifran."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Email de un único usuario")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(wrapped_data_key='')
+        if options['user']:
+            users = users.filter(email=options['user'])
+
+        done = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            done += rewrap_user_data_key(user_id)
+        self.stdout.write(self.style.SUCCESS(f"{done} claves de datos re-envueltas"))
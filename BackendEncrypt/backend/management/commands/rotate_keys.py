@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from backend.keys import USER_KEY_ID
+from backend.models import PasswordEntry
+from backend.utils import current_key_id, rotate_many
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-cifra con la clave activa (la primera de FERNET_KEYS) las entradas cifradas "
+        "con claves anteriores. Trabaja por lotes cortos ordenados por id, con pausa "
+        "entre lotes; se puede interrumpir y volver a lanzar en cualquier momento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Pausa en segundos entre lotes")
+        parser.add_argument('--after-id', type=int, default=0, help="Empieza después de este id")
+        parser.add_argument('--limit', type=int, help="Máximo de entradas a procesar en esta ejecución")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError("--batch-size debe ser positivo")
+
+        key_id = current_key_id()
+        # Las entradas con cifrado en sobre dependen de la DEK: se rotan con rewrap_data_keys
+        pending = PasswordEntry.objects.exclude(key_id__in=[key_id, USER_KEY_ID])
+        total = pending.filter(id__gt=options['after_id']).count()
+        self.stdout.write(f"{total} entradas por re-cifrar con la clave '{key_id}'")
+
+        # En Postgres se saltan las filas que un usuario tiene bloqueadas en ese momento;
+        # su escritura ya usa la clave activa o las recoge la siguiente ejecución.
+        lock = {'skip_locked': True} if connection.features.has_select_for_update_skip_locked else {}
+
+        last_id, done, started = options['after_id'], 0, time.monotonic()
+        while options['limit'] is None or done < options['limit']:
+            size = batch_size if options['limit'] is None else min(batch_size, options['limit'] - done)
+            with transaction.atomic():
+                batch = list(
+                    pending.filter(id__gt=last_id).order_by('id')
+                    .select_for_update(**lock).only('id', 'encrypted_pass', 'key_id')[:size]
+                )
+                if not batch:
+                    break
+                for entry, token in zip(batch, rotate_many([entry.encrypted_pass for entry in batch])):
+                    entry.encrypted_pass = token
+                    entry.key_id = key_id
+                # bulk_update no toca updated_at: rotar no es un cambio para los clientes
+                PasswordEntry.objects.bulk_update(batch, ['encrypted_pass', 'key_id'])
+
+            done += len(batch)
+            last_id = batch[-1].id
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{done}/{total} re-cifradas (último id {last_id}, {done / elapsed if elapsed else 0:.0f} filas/s)"
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Rotación terminada: {done} entradas re-cifradas"))
@@ -0,0 +1,304 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+# Métricas en proceso con formato de exposición de Prometheus (GET /metrics).
+# Los histogramas usan cubos logarítmicos al estilo HDR: 4 por cada potencia de 2
+# entre 50 µs y ~60 s, así el p99 sale con un error relativo < 19 % sea cual sea
+# la escala. Observar un valor es una búsqueda binaria y un incremento con lock.
+
+def _log_buckets(low, high, per_doubling):
+    factor = 2 ** (1 / per_doubling)
+    count = math.ceil(math.log(high / low, factor)) + 1
+    return tuple(low * factor ** i for i in range(count))
+
+
+LATENCY_BUCKETS = _log_buckets(0.00005, 60.0, 4)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # el último es +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Metric(ABC):
+    """Familia de series con las mismas etiquetas; labels(...) devuelve la serie."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new(self):
+        """Serie vacía de este tipo."""
+
+    @abstractmethod
+    def expose(self):
+        """Líneas de texto de todas las series."""
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new())
+        return series
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def _items(self):
+        # Copia bajo el lock: labels() puede añadir series mientras se expone
+        with self._lock:
+            return sorted(self._series.items())
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new(self):
+        return _Counter()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def expose(self):
+        for values, series in self._items():
+            yield f'{self.name}{_format_labels(self.labelnames, values)} {series.value}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def _new(self):
+        return _Histogram(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def expose(self):
+        for values, series in self._items():
+            counts, total = series.snapshot()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else f'{bound:.6g}'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, values, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, values)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, values)} {cumulative}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, func):
+        """func() -> [(nombre, tipo, ayuda, [(etiquetas, valor)])], leído solo al exponer."""
+        self._collectors.append(func)
+        return func
+
+    def clear(self):
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.expose())
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones por ruta (acción DRF).', ('route', 'method', 'status')
+)
+CRYPTO_LATENCY = registry.histogram(
+    'crypto_operation_duration_seconds', 'Duración de cada llamada de cifrado.', ('op',)
+)
+CRYPTO_ITEMS = registry.counter(
+    'crypto_items_total', 'Contraseñas procesadas por operación de cifrado.', ('op',)
+)
+DB_LATENCY = registry.histogram(
+    'db_query_duration_seconds', 'Duración de las consultas SQL por tipo.', ('kind',)
+)
+AUTH_FAILURES = registry.counter(
+    'auth_failures_total', 'Autenticaciones y logins rechazados por motivo.', ('reason',)
+)
+
+
+def metrics_enabled():
+    return settings.METRICS_ENABLED
+
+
+QUERY_KINDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def query_kind(sql):
+    head = sql.lstrip()[:6].upper()
+    return head if head in QUERY_KINDS else 'OTHER'
+
+
+def observe_query(sql, seconds):
+    if metrics_enabled():
+        DB_LATENCY.labels(query_kind(sql)).observe(seconds)
+
+
+def observe_crypto(op, seconds, count):
+    if metrics_enabled():
+        CRYPTO_LATENCY.labels(op).observe(seconds)
+        CRYPTO_ITEMS.labels(op).inc(count)
+
+
+def record_auth_failure(reason):
+    if metrics_enabled():
+        AUTH_FAILURES.labels(reason).inc()
+
+
+@registry.collector
+def _cache_stats():
+    # Las cachés ya llevan sus contadores: se leen al exponer, sin coste por petición
+    from .authentication import token_state_cache
+    from .cache import decrypted_cache
+    from .keys import data_key_cache
+    caches = {'data_key': data_key_cache, 'decrypted': decrypted_cache, 'token_state': token_state_cache}
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    return [
+        ('cache_requests_total', 'counter', 'Consultas a las cachés en memoria por resultado.', [
+            ({'cache': name, 'result': result}, stat[key])
+            for name, stat in stats.items() for result, key in (('hit', 'hits'), ('miss', 'misses'))
+        ]),
+        ('cache_entries', 'gauge', 'Entradas actuales en cada caché.', [
+            ({'cache': name}, stat['size']) for name, stat in stats.items()
+        ]),
+    ]
+
+
+# El método lo elige el cliente: fuera de los estándar todo cuenta como 'other',
+# si no cada método inventado crearía una serie nueva
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+
+
+def method_label(method):
+    return method if method in HTTP_METHODS else 'other'
+
+
+class MetricsMiddleware:
+    """Latencia por ruta; no se carga si METRICS_ENABLED está desactivado."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        from .profiling import install_query_recorder
+        install_query_recorder()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    def _observe(self, request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        if route == 'metrics':
+            return
+        REQUEST_LATENCY.labels(route, method_label(request.method), f'{response.status_code // 100}xx').observe(
+            time.perf_counter() - start
+        )
+
+
+def metrics_view(request):
+    """Exposición en texto para Prometheus; exige 'Authorization: Bearer <METRICS_TOKEN>'."""
+    token = settings.METRICS_TOKEN
+    # Sin token no se expone nunca (el check backend.E001 avisa al arrancar)
+    if not settings.METRICS_ENABLED or not token:
+        raise Http404
+    if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
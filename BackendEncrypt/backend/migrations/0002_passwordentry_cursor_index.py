@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordentry',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='entry_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:40
+
+from django.db import migrations
+
+SEARCH_FIELDS = ('title', 'username', 'service_url')
+
+SQL = {
+    'sqlite': (
+        [
+            """CREATE VIRTUAL TABLE IF NOT EXISTS backend_passwordentry_fts USING fts5(
+                owner, title, username, service_url,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )""",
+            """INSERT INTO backend_passwordentry_fts (rowid, owner, title, username, service_url)
+               SELECT id, 'u' || user_id, title, username, service_url FROM backend_passwordentry""",
+        ],
+        ["DROP TABLE IF EXISTS backend_passwordentry_fts"],
+    ),
+    'postgresql': (
+        ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f"CREATE INDEX IF NOT EXISTS entry_{field}_trgm_idx "
+            f"ON backend_passwordentry USING gin ({field} gin_trgm_ops)"
+            for field in SEARCH_FIELDS
+        ],
+        [f"DROP INDEX IF EXISTS entry_{field}_trgm_idx" for field in SEARCH_FIELDS],
+    ),
+}
+
+
+def run(index):
+    def operation(apps, schema_editor):
+        statements = SQL.get(schema_editor.connection.vendor)
+        if statements is None:
+            return
+        for statement in statements[index]:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_deletedpasswordentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(0), run(1)),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_passwordentry_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordentry',
+            name='service_domain',
+            field=models.CharField(blank=True, editable=False, max_length=253),
+        ),
+        migrations.AddIndex(
+            model_name='passwordentry',
+            index=models.Index(fields=['user', 'service_domain'], name='entry_user_domain_idx'),
+        ),
+    ]
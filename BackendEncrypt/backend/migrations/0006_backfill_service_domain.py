@@ -0,0 +1,76 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:33
+
+import ipaddress
+from urllib.parse import urlsplit
+
+from django.db import migrations
+
+CHUNK_SIZE = 1000
+
+# Copia congelada de backend.domains.registrable_domain tal como era en esta
+# migración: los cambios posteriores no deben alterar lo que calcula al reaplicarse.
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+    'com.br', 'net.br', 'org.br', 'gov.br',
+    'com.mx', 'org.mx', 'gob.mx', 'edu.mx',
+    'com.ar', 'gob.ar', 'com.co', 'gov.co', 'com.pe', 'gob.pe', 'com.ve', 'cl.cl',
+    'co.jp', 'ne.jp', 'or.jp', 'ac.jp', 'co.kr', 'or.kr',
+    'com.cn', 'net.cn', 'org.cn', 'com.hk', 'com.tw', 'com.sg', 'com.my',
+    'co.in', 'net.in', 'org.in', 'co.nz', 'org.nz', 'co.za', 'org.za',
+    'com.tr', 'com.es', 'nom.es', 'org.es', 'gob.es', 'com.pl', 'co.il',
+}
+
+
+def registrable_domain(url):
+    if not url:
+        return ''
+    if '//' not in url:
+        url = f'//{url}'
+    try:
+        host = urlsplit(url.strip()).hostname or ''
+    except ValueError:
+        return ''
+    host = host.rstrip('.')
+    if not host:
+        return ''
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    labels = host.split('.')
+    if len(labels) <= 2:
+        return host
+    if '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def backfill(apps, schema_editor):
+    # Por bloques de ids para no cargar la tabla entera en memoria
+    PasswordEntry = apps.get_model('backend', 'PasswordEntry')
+    last_id = 0
+    while True:
+        chunk = list(
+            PasswordEntry.objects.filter(id__gt=last_id).exclude(service_url='')
+            .order_by('id').only('id', 'service_url')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        for entry in chunk:
+            entry.service_domain = registrable_domain(entry.service_url)
+        PasswordEntry.objects.bulk_update(chunk, ['service_domain'])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_passwordentry_service_domain'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_backfill_service_domain'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordentry',
+            name='key_id',
+            field=models.CharField(default='0', max_length=16),
+        ),
+    ]
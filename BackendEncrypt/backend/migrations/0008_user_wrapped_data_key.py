@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_passwordentry_key_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='wrapped_data_key',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
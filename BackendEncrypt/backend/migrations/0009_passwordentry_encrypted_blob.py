@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_user_wrapped_data_key'),
+    ]
+
+    operations = [
+        # Nullable mientras conviven las dos columnas, para poder deshacer la migración
+        migrations.AlterField(
+            model_name='passwordentry',
+            name='encrypted_pass',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='passwordentry',
+            name='encrypted_blob',
+            field=models.BinaryField(null=True),
+        ),
+    ]
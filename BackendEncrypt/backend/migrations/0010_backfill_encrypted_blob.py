@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:36
+
+import base64
+
+from django.db import migrations, transaction
+
+CHUNK_SIZE = 1000
+
+
+def _copy(apps, source, target, convert):
+    # Por bloques de ids y una transacción por bloque: la tabla no queda bloqueada entera
+    PasswordEntry = apps.get_model('backend', 'PasswordEntry')
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                PasswordEntry.objects.filter(id__gt=last_id)
+                .order_by('id').only('id', source)[:CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            for entry in chunk:
+                setattr(entry, target, convert(getattr(entry, source)))
+            PasswordEntry.objects.bulk_update(chunk, [target])
+        last_id = chunk[-1].id
+
+
+def forwards(apps, schema_editor):
+    # El token en base64 pasa a sus bytes crudos
+    _copy(apps, 'encrypted_pass', 'encrypted_blob', base64.urlsafe_b64decode)
+
+
+def backwards(apps, schema_editor):
+    _copy(apps, 'encrypted_blob', 'encrypted_pass', lambda blob: base64.urlsafe_b64encode(blob).decode())
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('backend', '0009_passwordentry_encrypted_blob'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
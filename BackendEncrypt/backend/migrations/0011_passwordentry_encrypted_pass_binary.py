@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_backfill_encrypted_blob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='passwordentry',
+            name='encrypted_pass',
+        ),
+        migrations.RenameField(
+            model_name='passwordentry',
+            old_name='encrypted_blob',
+            new_name='encrypted_pass',
+        ),
+        migrations.AlterField(
+            model_name='passwordentry',
+            name='encrypted_pass',
+            field=models.BinaryField(),
+        ),
+    ]
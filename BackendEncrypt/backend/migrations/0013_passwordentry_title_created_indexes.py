@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordentry',
+            index=models.Index(fields=['user', 'title', '-id'], name='entry_user_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='entry_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:10
+
+import hashlib
+import ipaddress
+import pkgutil
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations
+
+CHUNK_SIZE = 1000
+
+# Copia congelada de backend.domains.registrable_domain en esta migración, con la
+# Public Suffix List que trae tldextract==5.4.0. Otra versión de la lista daría
+# otros dominios, así que con filas que recalcular se exige exactamente esa.
+PSL_SNAPSHOT_SHA256 = 'b69315c085d53972724b8f2df111ffc329b0c84fe0a47d62c8c91655cc774a38'
+WEB_SCHEMES = {'http', 'https'}
+_SCHEME = re.compile(r'^([a-z][a-z0-9+.-]*):(?!\d+(?:[/?#]|$))', re.IGNORECASE)
+
+
+def pinned_extractor():
+    import tldextract
+
+    snapshot = pkgutil.get_data('tldextract', '.tld_set_snapshot')
+    if hashlib.sha256(snapshot).hexdigest() != PSL_SNAPSHOT_SHA256:
+        raise RuntimeError(
+            "0014_recompute_service_domain necesita la Public Suffix List de tldextract==5.4.0; "
+            "instala esa versión para aplicar la migración y actualiza después"
+        )
+    return tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, include_psl_private_domains=True)
+
+
+def registrable_domain(url, extract):
+    if not url:
+        return ''
+    url = url.strip()
+    scheme = _SCHEME.match(url)
+    if scheme and scheme.group(1).lower() not in WEB_SCHEMES:
+        return ''
+    if '//' not in url:
+        url = f'//{url}'
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+    host = host.rstrip('.')
+    if not host:
+        return ''
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    parts = extract(host)
+    if parts.suffix and not parts.domain:
+        return ''
+    return parts.top_domain_under_public_suffix or host
+
+
+def recompute(apps, schema_editor):
+    # Dominios calculados con la lista de sufijos anterior: solo se reescriben los que cambian
+    PasswordEntry = apps.get_model('backend', 'PasswordEntry')
+    # Una base de datos nueva no tiene nada que recalcular ni necesita la lista
+    if not PasswordEntry.objects.exclude(service_url='').exists():
+        return
+    extract = pinned_extractor()
+    last_id = 0
+    while True:
+        chunk = list(
+            PasswordEntry.objects.filter(id__gt=last_id).exclude(service_url='')
+            .order_by('id').only('id', 'service_url', 'service_domain')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        changed = []
+        for entry in chunk:
+            domain = registrable_domain(entry.service_url, extract)
+            if domain != entry.service_domain:
+                entry.service_domain = domain
+                changed.append(entry)
+        PasswordEntry.objects.bulk_update(changed, ['service_domain'])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_passwordentry_title_created_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute, migrations.RunPython.noop),
+    ]
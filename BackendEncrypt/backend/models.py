@@ -28,6 +28,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Clave de datos del usuario cifrada con la clave maestra (ver backend/keys.py)
+    wrapped_data_key = models.TextField(blank=True, editable=False)
+    # Se incrementa para revocar todos los JWT emitidos (ver backend/authentication.py)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -42,16 +46,97 @@ class PasswordEntry(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
     username = models.CharField(max_length=100, blank=True)
-    encrypted_pass = models.TextField()
+    # Token binario; el primer byte es la versión del formato (backend/ciphers.py)
+    encrypted_pass = models.BinaryField()
+    # Id de la clave (settings.FERNET_KEYS) con la que se cifró encrypted_pass
+    key_id = models.CharField(max_length=16, default='0')
     service_url = models.URLField(blank=True)
+    # Dominio registrable de service_url, derivado al guardar (autocompletado)
+    service_domain = models.CharField(max_length=253, blank=True, editable=False)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor (updated_at, id) del listado
+            models.Index(fields=['user', '-updated_at', '-id'], name='entry_user_updated_idx'),
+            models.Index(fields=['user', 'service_domain'], name='entry_user_domain_idx'),
+            # Búsqueda sin FTS ordenada por título y listados por fecha de alta
+            models.Index(fields=['user', 'title', '-id'], name='entry_user_title_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='entry_user_created_idx'),
+        ]
+
     def set_password(self, raw_password):
-        from .utils import encrypt_password
-        self.encrypted_pass = encrypt_password(raw_password)
+        PasswordEntry.set_passwords([self], [raw_password])
+
+    @staticmethod
+    def _encryption_key(entries):
+        # Con cifrado en sobre se usa la DEK del dueño; si no, la clave maestra activa
+        from .keys import USER_KEY_ID, envelope_enabled, get_user_data_key
+        from .utils import current_key_id
+        user_ids = {entry.user_id for entry in entries}
+        if not envelope_enabled() or len(user_ids) != 1:
+            return current_key_id(), None
+        return USER_KEY_ID, get_user_data_key(user_ids.pop())
+
+    @staticmethod
+    def set_passwords(entries, raw_passwords):
+        """set_password por lotes (todas del mismo usuario): cifra todo con encrypt_many."""
+        from .utils import encrypt_many
+        key_id, data_key = PasswordEntry._encryption_key(entries)
+        for entry, token in zip(entries, encrypt_many(raw_passwords, data_key)):
+            entry.encrypted_pass = token
+            entry.key_id = key_id
+
+    @staticmethod
+    async def aset_passwords(entries, raw_passwords):
+        from asgiref.sync import sync_to_async
+        from .utils import aencrypt_many
+        key_id, data_key = await sync_to_async(PasswordEntry._encryption_key)(entries)
+        for entry, token in zip(entries, await aencrypt_many(raw_passwords, data_key)):
+            entry.encrypted_pass = token
+            entry.key_id = key_id
 
     def get_password(self):
-        from .utils import decrypt_password
-        return decrypt_password(self.encrypted_pass)
+        from .cache import decrypt_entries
+        return decrypt_entries([self])[0]
+
+    def refresh_service_domain(self):
+        from .domains import registrable_domain
+        self.service_domain = registrable_domain(self.service_url)
+
+    def save(self, *args, **kwargs):
+        from .cache import decrypted_cache
+        decrypted_cache.invalidate(self.pk)
+        self.refresh_service_domain()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'service_url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'service_domain'}
+        super().save(*args, **kwargs)
+
+
+# Lápida de una entrada borrada: permite a los clientes sincronizar borrados
+class DeletedPasswordEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    entry_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+
+# Progreso de import_vault: se guarda en la misma transacción que cada bloque
+# importado, así que --resume nunca repite ni pierde registros
+class ImportCheckpoint(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=512)
+    done = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='import_checkpoint_user_name_uniq'),
+        ]
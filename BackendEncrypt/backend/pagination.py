@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+def parse_position(position):
+    """'<updated_at iso>|<id>' -> (datetime, int). ValueError si no es válida."""
+    try:
+        raw_updated_at, raw_pk = position.rsplit('|', 1)
+        updated_at = parse_datetime(raw_updated_at)
+        pk = int(raw_pk)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f"Invalid position: {position!r}")
+    if updated_at is None:
+        raise ValueError(f"Invalid position: {position!r}")
+    return updated_at, pk
+
+
+def keyset_filter(position, reverse=False):
+    # El orden base es descendente; un cursor hacia atrás pide lo posterior
+    updated_at, pk = parse_position(position)
+    if reverse:
+        return Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+    return Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=pk)
+
+
+def position_of(entry):
+    return f"{entry.updated_at.isoformat()}|{entry.pk}"
+
+
+# Paginación keyset sobre (updated_at, id): cada página es una búsqueda por
+# índice, así que la latencia no depende del tamaño de la bóveda.
+class PasswordEntryCursorPagination(CursorPagination):
+    ordering = ('-updated_at', '-id')
+    page_size = settings.PASSWORD_ENTRY_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PASSWORD_ENTRY_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    # paginate_queryset en dos mitades para que las vistas async evalúen el
+    # queryset con el ORM async entre una y otra
+
+    def page_queryset(self, queryset, request):
+        """Lee cursor y page_size de la petición; devuelve el queryset de la página (+1 fila) o None."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.reverse, self.current_position = False, None
+        else:
+            self.reverse, self.current_position = self.cursor.reverse, self.cursor.position
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # La posición (updated_at, id) es única, así que nunca hace falta offset
+        if self.current_position is not None:
+            queryset = queryset.filter(self._keyset_filter(self.current_position, self.reverse))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Recibe las filas de page_queryset y calcula la página y los enlaces next/previous."""
+        reverse, current_position = self.reverse, self.current_position
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _keyset_filter(self, position, reverse):
+        try:
+            return keyset_filter(position, reverse)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            return f"{instance['updated_at']}|{instance['id']}"
+        return position_of(instance)
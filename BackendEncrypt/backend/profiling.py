@@ -0,0 +1,172 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import observe_crypto, observe_query
+
+# Perfilado por petición (settings.REQUEST_PROFILING): nº de consultas SQL,
+# tiempo en base de datos y tiempo de cifrado. Se devuelve en la cabecera
+# Server-Timing y se registra una línea JSON en el logger "backend.profiling".
+# Sin una petición perfilada en curso solo se alimentan las métricas (backend/metrics.py).
+
+logger = logging.getLogger('backend.profiling')
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    db_ms: float = 0.0
+    crypto_ops: int = 0
+    crypto_ms: float = 0.0
+
+
+_current = ContextVar('request_profile', default=None)
+
+
+def current_profile():
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        observe_query(sql, elapsed)
+        profile = _current.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.db_ms += elapsed * 1000
+
+
+def _install_query_recorder(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_recorder_lock = threading.Lock()
+_recorder_installed = False
+
+
+def install_query_recorder():
+    """
+    Cuenta las consultas de todas las conexiones, también las que abran otros hilos.
+    Idempotente: los middlewares lo llaman cada vez que se construye el handler.
+    """
+    global _recorder_installed
+    with _recorder_lock:
+        if _recorder_installed:
+            return
+        connection_created.connect(_install_query_recorder, dispatch_uid='backend.profiling')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(connection=connection)
+        _recorder_installed = True
+
+
+def _record_crypto(op, start, count):
+    elapsed = time.perf_counter() - start
+    observe_crypto(op, elapsed, count)
+    profile = _current.get()
+    if profile is not None:
+        profile.crypto_ops += count
+        profile.crypto_ms += elapsed * 1000
+
+
+def _batch_size(args):
+    # Funciones por lotes: el primer argumento es la lista de entrada
+    return len(args[0]) if args and isinstance(args[0], (list, tuple)) else 1
+
+
+def timed_crypto(func):
+    """Acumula el tiempo de una operación de cifrado en el perfil de la petición y en las métricas."""
+    op = func.__name__
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _record_crypto(op, start, _batch_size(args))
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record_crypto(op, start, _batch_size(args))
+    return wrapper
+
+
+def server_timing(profile, total_ms):
+    return (
+        f'db;dur={profile.db_ms:.1f};desc="{profile.queries} queries", '
+        f'crypto;dur={profile.crypto_ms:.1f};desc="{profile.crypto_ops} ops", '
+        f'total;dur={total_ms:.1f}'
+    )
+
+
+class RequestProfilingMiddleware:
+    """Middleware de perfilado; no se carga si REQUEST_PROFILING está desactivado."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_query_recorder()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, start)
+
+    async def __acall__(self, request):
+        profile, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, start)
+
+    def _start(self):
+        profile = RequestProfile()
+        return profile, _current.set(profile), time.perf_counter()
+
+    def _finish(self, request, response, profile, start):
+        # En respuestas en streaming solo cuenta hasta la cabecera, no el cuerpo
+        total_ms = (time.perf_counter() - start) * 1000
+        response['Server-Timing'] = server_timing(profile, total_ms)
+        match = getattr(request, 'resolver_match', None)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in asdict(profile).items()},
+        }))
+        return response
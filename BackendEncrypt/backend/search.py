@@ -0,0 +1,93 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import PasswordEntry
+
+# Búsqueda por prefijo sobre title/username/service_url sin descifrar nada.
+# SQLite: tabla virtual FTS5 mantenida por señales. Postgres: índices GIN pg_trgm.
+# Ambos se crean en la migración 0004.
+# Otros motores: icontains sin índice.
+
+FTS_TABLE = 'backend_passwordentry_fts'
+SEARCH_FIELDS = ('title', 'username', 'service_url')
+
+
+def _uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def index_entries(entries):
+    """(Re)indexa entradas en FTS5. Lo llaman las señales y las rutas bulk."""
+    if not _uses_fts() or not entries:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(entry.pk,) for entry in entries])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, owner, title, username, service_url) VALUES (%s, %s, %s, %s, %s)",
+            [(e.pk, f"u{e.user_id}", e.title, e.username, e.service_url) for e in entries],
+        )
+
+
+def unindex_entries(entry_ids):
+    if not _uses_fts() or not entry_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in entry_ids])
+
+
+def _fts_query(user_id, terms):
+    prefixes = ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    return f'owner:"u{user_id}" AND {{title username service_url}} : ({prefixes})'
+
+
+def _search_sqlite(user_id, terms, limit):
+    with connection.cursor() as cursor:
+        # bm25: menor es mejor; title pesa más que username y que la URL
+        cursor.execute(
+            f"""SELECT rowid FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s
+                ORDER BY bm25({FTS_TABLE}, 0.0, 10.0, 5.0, 1.0), rowid DESC
+                LIMIT %s""",
+            [_fts_query(user_id, terms), limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_postgres(user_id, query, limit):
+    like = '%' + re.sub(r'([%_\\])', r'\\\1', query) + '%'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """SELECT id FROM backend_passwordentry
+               WHERE user_id = %s AND (title ILIKE %s OR username ILIKE %s OR service_url ILIKE %s)
+               ORDER BY GREATEST(similarity(title, %s), similarity(username, %s), similarity(service_url, %s)) DESC,
+                        id DESC
+               LIMIT %s""",
+            [user_id, like, like, like, query, query, query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_fallback(user_id, query, limit):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': query})
+    return list(
+        PasswordEntry.objects.filter(condition, user_id=user_id).order_by('title', '-id').values_list('id', flat=True)[:limit]
+    )
+
+
+def search_entries(user_id, query, limit=20):
+    """Entradas del usuario que coinciden con `query`, ordenadas por relevancia."""
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return []
+    if _uses_fts():
+        ids = _search_sqlite(user_id, terms, limit)
+    elif connection.vendor == 'postgresql':
+        ids = _search_postgres(user_id, query.strip(), limit)
+    else:
+        ids = _search_fallback(user_id, query.strip(), limit)
+    entries = PasswordEntry.objects.filter(user_id=user_id).in_bulk(ids)
+    return [entries[pk] for pk in ids if pk in entries]
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.db import models
 from rest_framework import serializers
 from .models import User, PasswordEntry
+from .authentication import TOKEN_VERSION_CLAIM
+from .cache import decrypt_entries, decrypted_cache
 
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -8,8 +12,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        # Agrega info adicional si quieres
+        # Claims con los que StatelessJWTAuthentication arma el usuario sin ir a la BD
         token['username'] = user.username
+        token['email'] = user.email
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = user.token_version
         return token
 
 
@@ -61,18 +68,38 @@ class UserSerializer(serializers.ModelSerializer):
 #         instance.save()
 #         return instance
 
+# Descifra todas las entradas de la página en un solo lote
+class PasswordEntryListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        entries = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        plain = decrypt_entries(entries)
+        self.child.page_passwords = {entry.pk: password for entry, password in zip(entries, plain)}
+        try:
+            return super().to_representation(entries)
+        finally:
+            self.child.page_passwords = {}
+
+
 class PasswordEntrySerializer(serializers.ModelSerializer):
     raw_password = serializers.CharField(write_only=True, required=True)
-    decrypted_password = serializers.CharField(read_only=True, source='get_password')
+    decrypted_password = serializers.SerializerMethodField()
 
     class Meta:
         model = PasswordEntry
         fields = [
             'id', 'user', 'title', 'username',
-            'service_url', 'created_at', 'updated_at',
+            'service_url', 'service_domain', 'created_at', 'updated_at',
             'raw_password', 'decrypted_password'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'decrypted_password', 'user']  # user es solo lectura
+        read_only_fields = ['id', 'created_at', 'updated_at', 'decrypted_password', 'user', 'service_domain']  # user es solo lectura
+        list_serializer_class = PasswordEntryListSerializer
+
+    page_passwords = {}
+
+    def get_decrypted_password(self, obj) -> str:
+        if obj.pk in self.page_passwords:
+            return self.page_passwords[obj.pk]
+        return obj.get_password()
 
     def create(self, validated_data):
         raw_password = validated_data.pop('raw_password')
@@ -87,5 +114,56 @@ class PasswordEntrySerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         if raw_password:
             instance.set_password(raw_password)
+            decrypted_cache.invalidate(instance.pk)
         instance.save()
         return instance
+
+
+# Serializer de solo metadatos: no descifra nada
+class PasswordEntryMetadataSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PasswordEntry
+        fields = [
+            'id', 'user', 'title', 'username',
+            'service_url', 'service_domain', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
+# Petición de revelado por lotes: ids de las entradas a descifrar
+class PasswordRevealSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.PASSWORD_ENTRY_MAX_PAGE_SIZE,
+    )
+
+
+# Petición bulk: lista de operaciones create/update/delete
+class PasswordBulkSerializer(serializers.Serializer):
+    operations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.PASSWORD_BULK_MAX_OPERATIONS,
+    )
+
+
+# Parámetros de /passwords/search/
+class PasswordSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=1, max_length=100, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+# Parámetros de /passwords/changes/
+class PasswordChangesSerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(
+        min_value=1, max_value=settings.PASSWORD_ENTRY_MAX_PAGE_SIZE, default=settings.PASSWORD_SYNC_PAGE_SIZE
+    )
+
+
+# Parámetros de /passwords/autofill/
+class PasswordAutofillSerializer(serializers.Serializer):
+    url = serializers.CharField(max_length=2048)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
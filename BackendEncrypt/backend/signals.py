@@ -0,0 +1,41 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import token_state_cache
+from .cache import decrypted_cache
+from .models import DeletedPasswordEntry, PasswordEntry, User
+from .search import index_entries, unindex_entries
+from .sync import tombstones_deferred
+
+
+@receiver(post_delete, sender=PasswordEntry)
+def invalidate_deleted_entry(sender, instance, **kwargs):
+    decrypted_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=PasswordEntry)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Si se borra el usuario entero (uno o un queryset) no hay nadie a quien sincronizar.
+    # Los borrados masivos insertan sus lápidas de una vez (sync.record_tombstones)
+    deleting_users = isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+    if deleting_users or tombstones_deferred():
+        return
+    DeletedPasswordEntry.objects.create(user_id=instance.user_id, entry_id=instance.pk)
+
+
+@receiver(post_save, sender=PasswordEntry)
+def index_saved_entry(sender, instance, **kwargs):
+    index_entries([instance])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_token_state(sender, instance, **kwargs):
+    # Desactivar o borrar un usuario corta sus tokens sin esperar al TTL
+    token_state_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=PasswordEntry)
+def unindex_deleted_entry(sender, instance, **kwargs):
+    unindex_entries([instance.pk])
@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import DeletedPasswordEntry
+from .pagination import keyset_filter, parse_position, position_of
+
+WATERMARK_SALT = 'backend.sync.watermark'
+CURSOR_SALT = 'backend.sync.cursor'
+TOMBSTONE_BATCH_SIZE = 1000
+
+
+def issue_watermark():
+    """Marca de agua firmada para la próxima sincronización, con margen para commits tardíos."""
+    watermark = timezone.now() - timedelta(seconds=settings.PASSWORD_SYNC_WATERMARK_LAG)
+    return signing.dumps(watermark.isoformat(), salt=WATERMARK_SALT)
+
+
+def read_watermark(token):
+    """Devuelve el datetime de una marca de agua emitida por el servidor. ValueError si no es válida."""
+    try:
+        watermark = parse_datetime(signing.loads(token, salt=WATERMARK_SALT))
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValueError("Invalid watermark")
+    if watermark is None:
+        raise ValueError("Invalid watermark")
+    return watermark
+
+
+def tombstone_horizon():
+    """Las lápidas anteriores a este instante pueden haberse purgado."""
+    return timezone.now() - timedelta(days=settings.PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+# Una sincronización larga se reparte en páginas. El cursor firmado lleva el
+# `since` y la marca de agua de la primera página, la fase (primero entradas por
+# (updated_at, id), luego borrados por (deleted_at, id)) y la última posición.
+
+def new_sync_state(since):
+    # La marca nueva se emite antes de consultar para no perder nada entre medias
+    return {
+        'since': since.isoformat() if since else None,
+        'watermark': issue_watermark(),
+        'phase': 'changed',
+        'after': None,
+    }
+
+
+def issue_cursor(state):
+    return signing.dumps(state, salt=CURSOR_SALT)
+
+
+def read_cursor(token):
+    """Estado de sincronización de un cursor emitido por el servidor. ValueError si no es válido."""
+    try:
+        state = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError("Invalid cursor")
+    if not isinstance(state, dict) or state.get('phase') not in ('changed', 'deleted'):
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def _tombstones_after(position):
+    deleted_at, pk = parse_position(position)
+    return Q(deleted_at__gt=deleted_at) | Q(deleted_at=deleted_at, id__gt=pk)
+
+
+def changes_page(queryset, user_id, state, page_size):
+    """
+    Una página de cambios desde state['since'] (None = todo).
+    Devuelve (entradas, ids borrados, estado de la página siguiente o None si es la última).
+    """
+    since = parse_datetime(state['since']) if state['since'] else None
+    changed = []
+    if state['phase'] == 'changed':
+        entries = queryset.order_by('updated_at', 'id')
+        if since is not None:
+            entries = entries.filter(updated_at__gt=since)
+        if state['after']:
+            entries = entries.filter(keyset_filter(state['after'], reverse=True))
+        changed = list(entries[:page_size + 1])
+        if len(changed) > page_size:
+            changed = changed[:page_size]
+            return changed, [], {**state, 'after': position_of(changed[-1])}
+        state = {**state, 'phase': 'deleted', 'after': None}
+
+    # Primera sincronización: el cliente no tiene nada que borrar
+    if since is None:
+        return changed, [], None
+    remaining = page_size - len(changed)
+    if remaining == 0:
+        return changed, [], state
+
+    tombstones = DeletedPasswordEntry.objects.filter(user_id=user_id, deleted_at__gt=since).order_by('deleted_at', 'id')
+    if state['after']:
+        tombstones = tombstones.filter(_tombstones_after(state['after']))
+    rows = list(tombstones.values_list('deleted_at', 'id', 'entry_id')[:remaining + 1])
+    following = None
+    if len(rows) > remaining:
+        rows = rows[:remaining]
+        following = {**state, 'after': f"{rows[-1][0].isoformat()}|{rows[-1][1]}"}
+    return changed, list(dict.fromkeys(entry_id for _, _, entry_id in rows)), following
+
+
+# Borrados masivos: una sola inserción de lápidas en vez de una por fila desde post_delete
+_tombstones_deferred = ContextVar('tombstones_deferred', default=False)
+
+
+def tombstones_deferred():
+    return _tombstones_deferred.get()
+
+
+@contextmanager
+def defer_tombstones():
+    """Dentro del bloque post_delete no crea lápidas; quien borra llama a record_tombstones."""
+    token = _tombstones_deferred.set(True)
+    try:
+        yield
+    finally:
+        _tombstones_deferred.reset(token)
+
+
+def record_tombstones(user_id, entry_ids):
+    now = timezone.now()
+    DeletedPasswordEntry.objects.bulk_create(
+        [DeletedPasswordEntry(user_id=user_id, entry_id=entry_id, deleted_at=now) for entry_id in entry_ids],
+        batch_size=TOMBSTONE_BATCH_SIZE,
+    )
+
+
+def prune_tombstones(before=None):
+    """Borra por bloques las lápidas anteriores a `before` (por defecto tombstone_horizon())."""
+    before = before or tombstone_horizon()
+    total = 0
+    while True:
+        ids = list(
+            DeletedPasswordEntry.objects.filter(deleted_at__lt=before)
+            .order_by('id').values_list('id', flat=True)[:TOMBSTONE_BATCH_SIZE]
+        )
+        if not ids:
+            return total
+        total += DeletedPasswordEntry.objects.filter(id__in=ids).delete()[0]
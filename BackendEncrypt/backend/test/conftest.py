@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture(autouse=True)
+def _reset_login_throttle():
+    # Las ventanas de login viven en una caché local: cada test empieza de cero
+    caches['login_throttle'].clear()
+    yield
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    with query_budget(3): ...  falla si el bloque lanza más de 3 consultas SQL.
+    Sirve para fijar el presupuesto de cada endpoint y detectar N+1.
+    """
+    @contextmanager
+    def budget(max_queries):
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        executed = len(queries.captured_queries)
+        assert executed <= max_queries, (
+            f"{executed} consultas, presupuesto {max_queries}:\n"
+            + "\n".join(query['sql'] for query in queries.captured_queries)
+        )
+    return budget
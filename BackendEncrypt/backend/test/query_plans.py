@@ -0,0 +1,69 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Utilidad de tests: captura las consultas de un bloque, obtiene su plan
+# (EXPLAIN QUERY PLAN en SQLite, EXPLAIN en Postgres) y falla si alguna recorre
+# entera una tabla de la app o necesita ordenar en un B-tree temporal.
+
+APP_TABLES = ('backend_passwordentry', 'backend_deletedpasswordentry', 'backend_user')
+
+BAD_PLANS = {
+    # "SCAN tabla" sin índice; "SCAN tabla USING INDEX" es un recorrido ordenado por índice
+    'sqlite': [
+        re.compile(rf'^SCAN ({"|".join(APP_TABLES)})\b(?!.*\bUSING\b)'),
+        re.compile(r'USE TEMP B-TREE'),
+    ],
+    'postgresql': [
+        re.compile(rf'Seq Scan on ({"|".join(APP_TABLES)})\b'),
+        re.compile(r'^\s*(->\s*)?Sort\b'),
+    ],
+}
+
+
+# Con tablas de pocas filas Postgres prefiere Seq Scan + Sort aunque exista el
+# índice. Se desactivan ambos: si aún aparecen es que ningún índice sirve.
+POSTGRES_PLANNER = ('enable_seqscan', 'enable_sort')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            # (id, parent, notused, detail)
+            return [row[-1] for row in cursor.fetchall()]
+        for name in POSTGRES_PLANNER:
+            cursor.execute(f'SET {name} = off')
+        try:
+            cursor.execute('EXPLAIN ' + sql)
+            # Una línea del plan por fila
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            for name in POSTGRES_PLANNER:
+                cursor.execute(f'RESET {name}')
+
+
+def bad_plan_lines(sql):
+    patterns = BAD_PLANS.get(connection.vendor, [])
+    return [line for line in explain(sql) if any(p.search(line) for p in patterns)]
+
+
+@contextmanager
+def assert_indexed_queries(allow=()):
+    """
+    Falla si alguna SELECT del bloque hace un recorrido completo o un ordenado temporal.
+    allow: regex de consultas que ordenan a propósito (p. ej. por relevancia) y se omiten.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        yield queries
+    failures = []
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if not sql.lstrip().upper().startswith('SELECT') or any(re.search(p, sql) for p in allow):
+            continue
+        lines = bad_plan_lines(sql)
+        if lines:
+            failures.append(f"{sql}\n    -> {'; '.join(lines)}")
+    assert not failures, "Consultas sin índice:\n" + "\n".join(failures)
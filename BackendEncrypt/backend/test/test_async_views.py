@@ -0,0 +1,126 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='asyncuser',
+        email='async@gmail.com',
+        password='testpassword123'
+    )
+
+
+class JWTAsyncClient(AsyncClient):
+    # AsyncClient no propaga las cabeceras del constructor al scope ASGI
+    def __init__(self, token, **kwargs):
+        super().__init__(**kwargs)
+        self.token = token
+
+    def generic(self, *args, headers=None, **kwargs):
+        headers = {'Authorization': f'Bearer {self.token}', **(headers or {})}
+        return super().generic(*args, headers=headers, **kwargs)
+
+
+@pytest.fixture
+def async_client(test_user):
+    return JWTAsyncClient(AccessToken.for_user(test_user))
+
+
+@pytest.mark.django_db
+def test_async_crud(async_client, test_user):
+    list_url = reverse('async-passwordentry-list')
+
+    created = async_to_sync(async_client.post)(
+        list_url, {'title': 'Async', 'raw_password': 'secret'}, content_type='application/json'
+    )
+    assert created.status_code == 201
+    entry_id = created.json()['id']
+    assert created.json()['decrypted_password'] == 'secret'
+    assert PasswordEntry.objects.get(id=entry_id).user == test_user
+
+    detail_url = reverse('async-passwordentry-detail', args=[entry_id])
+    updated = async_to_sync(async_client.patch)(
+        detail_url, {'raw_password': 'nuevo'}, content_type='application/json'
+    )
+    assert updated.json()['decrypted_password'] == 'nuevo'
+    assert updated.json()['title'] == 'Async'
+
+    listed = async_to_sync(async_client.get)(list_url, {'mode': 'metadata'})
+    assert listed.status_code == 200
+    assert [row['id'] for row in listed.json()['results']] == [entry_id]
+    assert 'decrypted_password' not in listed.json()['results'][0]
+
+    deleted = async_to_sync(async_client.delete)(detail_url)
+    assert deleted.status_code == 204
+    assert not PasswordEntry.objects.filter(id=entry_id).exists()
+
+
+@pytest.mark.django_db
+def test_async_paginacion(async_client, test_user):
+    for i in range(5):
+        entry = PasswordEntry(user=test_user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+
+    url = reverse('async-passwordentry-list')
+    first = async_to_sync(async_client.get)(url, {'page_size': 3}).json()
+    second = async_to_sync(async_client.get)(first['next']).json()
+    back = async_to_sync(async_client.get)(second['previous']).json()
+
+    assert len(first['results']) == 3
+    assert len(second['results']) == 2
+    assert first['previous'] is None
+    assert second['next'] is None
+    assert [r['id'] for r in back['results']] == [r['id'] for r in first['results']]
+    assert {r['decrypted_password'] for r in first['results'] + second['results']} == {f"secret{i}" for i in range(5)}
+
+
+@pytest.mark.django_db
+def test_async_paginacion_igual_que_drf(async_client, test_user):
+    for i in range(5):
+        entry = PasswordEntry(user=test_user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+    drf = APIClient()
+    drf.force_authenticate(user=test_user)
+
+    async_page = async_to_sync(async_client.get)(reverse('async-passwordentry-list'), {'page_size': 2}).json()
+    drf_page = drf.get(reverse('passwordentry-list'), {'page_size': 2}).data
+    # Mismo cursor codificado: un cliente puede pasar de una API a la otra
+    assert parse_qs(urlsplit(async_page['next']).query) == parse_qs(urlsplit(drf_page['next']).query)
+    assert [r['id'] for r in async_page['results']] == [r['id'] for r in drf_page['results']]
+
+    bad = async_to_sync(async_client.get)(reverse('async-passwordentry-list'), {'cursor': 'basura'})
+    assert bad.status_code == drf.get(reverse('passwordentry-list'), {'cursor': 'basura'}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_requiere_token(test_user):
+    response = async_to_sync(AsyncClient().get)(reverse('async-passwordentry-list'))
+    assert response.status_code == 401
+
+    bad = JWTAsyncClient('basura')
+    assert async_to_sync(bad.get)(reverse('async-passwordentry-list')).status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_no_ve_entradas_ajenas(async_client):
+    otro = User.objects.create_user(username='otro', email='otro@gmail.com', password='x')
+    ajena = PasswordEntry(user=otro, title="Ajena")
+    ajena.set_password("nope")
+    ajena.save()
+
+    response = async_to_sync(async_client.get)(reverse('async-passwordentry-detail', args=[ajena.id]))
+    assert response.status_code == 404
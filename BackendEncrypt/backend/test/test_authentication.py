@@ -0,0 +1,99 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.authentication import ClaimsUser, revoke_tokens, token_state_cache
+from backend.serializer import CustomTokenObtainPairSerializer
+from backend.test.test_async_views import JWTAsyncClient
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    token_state_cache.clear()
+    return User.objects.create_user(username='authuser', email='auth@gmail.com', password='testpassword123')
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def access_token(user):
+    return CustomTokenObtainPairSerializer.get_token(user).access_token
+
+
+@pytest.mark.django_db
+def test_claims_del_token(test_user):
+    user = ClaimsUser(access_token(test_user))
+    assert user.pk == test_user.pk
+    assert user.username == 'authuser'
+    assert user.email == 'auth@gmail.com'
+    assert user.is_active is True
+    assert user.token_version == 0
+
+
+@pytest.mark.django_db
+def test_peticion_sin_consultar_user(test_user):
+    client = client_for(access_token(test_user))
+    url = reverse('passwordentry-list')
+    assert client.get(url).status_code == 200  # calienta la caché de estado
+
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get(url).status_code == 200
+    assert not any('"backend_user"' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_revocar_invalida_tokens_emitidos(test_user):
+    client = client_for(access_token(test_user))
+    url = reverse('passwordentry-list')
+    assert client.get(url).status_code == 200
+
+    revoke_tokens(test_user.pk)
+    assert client.get(url).status_code == 401
+
+    test_user.refresh_from_db()
+    assert client_for(access_token(test_user)).get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_usuario_desactivado_o_borrado(test_user):
+    client = client_for(access_token(test_user))
+    url = reverse('passwordentry-list')
+    assert client.get(url).status_code == 200
+
+    test_user.is_active = False
+    test_user.save()
+    assert client.get(url).status_code == 401
+
+    test_user.delete()
+    assert client.get(url).status_code == 401
+
+
+@pytest.mark.django_db
+def test_tokens_sin_version_cuentan_como_cero(test_user):
+    client = client_for(AccessToken.for_user(test_user))
+    url = reverse('passwordentry-list')
+    assert client.get(url).status_code == 200
+    revoke_tokens(test_user.pk)
+    assert client.get(url).status_code == 401
+
+
+@pytest.mark.django_db
+def test_vistas_async_respetan_la_revocacion(test_user):
+    client = JWTAsyncClient(access_token(test_user))
+    url = reverse('async-passwordentry-list')
+    assert async_to_sync(client.get)(url).status_code == 200
+
+    revoke_tokens(test_user.pk)
+    response = async_to_sync(client.get)(url)
+    assert response.status_code == 401
+    assert response.json()['code'] == 'token_revoked'
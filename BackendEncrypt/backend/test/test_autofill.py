@@ -0,0 +1,150 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.bulk import apply_operations
+from backend.domains import registrable_domain
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='autofilluser',
+        email='autofill@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+def crear(user, title, service_url):
+    entry = PasswordEntry(user=user, title=title, service_url=service_url)
+    entry.set_password("secret")
+    entry.save()
+    return entry
+
+
+@pytest.mark.parametrize("url, domain", [
+    ("https://mail.google.com/mail/u/0", "google.com"),
+    ("google.com", "google.com"),
+    ("https://WWW.BBC.CO.UK/news", "bbc.co.uk"),
+    ("http://192.168.1.1:8080/admin", "192.168.1.1"),
+    ("https://localhost:3000", "localhost"),
+    # Sufijos privados de la PSL: cada inquilino es un sitio distinto
+    ("https://alice.github.io/repo", "alice.github.io"),
+    ("https://app.herokuapp.com", "app.herokuapp.com"),
+    ("https://blog.example.blogspot.com", "example.blogspot.com"),
+    ("example.com:8080/login", "example.com"),
+    ("localhost:3000", "localhost"),
+    ("", ""),
+    # No son orígenes web: sin dominio, así nunca coinciden entre sí
+    ("javascript:alert(1)", ""),
+    ("JavaScript://example.com/%0Aalert(1)", ""),
+    ("mailto:alice@example.com", ""),
+    ("ftp://example.com/file", ""),
+    ("data:text/html,hola", ""),
+    # Un sufijo público solo no identifica ningún sitio
+    ("https://github.io", ""),
+    ("co.uk", ""),
+    ("https://www.co.uk.", "www.co.uk"),
+])
+def test_registrable_domain(url, domain):
+    assert registrable_domain(url) == domain
+
+
+@pytest.mark.django_db
+def test_autofill_por_dominio(api_client, test_user):
+    crear(test_user, "Gmail", "https://mail.google.com")
+    crear(test_user, "Drive", "https://drive.google.com/drive")
+    crear(test_user, "Netflix", "https://www.netflix.com")
+
+    response = api_client.get(reverse('passwordentry-autofill'), {'url': 'https://accounts.google.com/signin'})
+
+    assert response.status_code == 200
+    assert response.data['domain'] == "google.com"
+    assert {item['title'] for item in response.data['results']} == {"Gmail", "Drive"}
+    assert 'decrypted_password' not in response.data['results'][0]
+
+
+@pytest.mark.django_db
+def test_dominio_se_actualiza_al_guardar(test_user):
+    entry = crear(test_user, "Gmail", "https://mail.google.com")
+    entry.service_url = "https://github.com/login"
+    entry.save(update_fields=['service_url'])
+    assert PasswordEntry.objects.get(pk=entry.pk).service_domain == "github.com"
+
+    apply_operations(test_user.pk, [{'op': 'update', 'id': entry.pk, 'service_url': 'https://gitlab.com'}])
+    assert PasswordEntry.objects.get(pk=entry.pk).service_domain == "gitlab.com"
+
+
+@pytest.mark.django_db
+def test_autofill_url_invalida(api_client):
+    assert api_client.get(reverse('passwordentry-autofill'), {'url': '///'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_autofill_no_mezcla_inquilinos_de_sufijos_privados(api_client, test_user):
+    crear(test_user, "Alice", "https://alice.github.io/login")
+    crear(test_user, "Mallory", "https://mallory.github.io/login")
+
+    response = api_client.get(reverse('passwordentry-autofill'), {'url': 'https://mallory.github.io'})
+
+    assert response.data['domain'] == "mallory.github.io"
+    assert [item['title'] for item in response.data['results']] == ["Mallory"]
+
+
+@pytest.mark.django_db
+def test_autofill_limita_resultados(api_client, test_user):
+    for i in range(15):
+        crear(test_user, f"Cuenta {i}", "https://example.com")
+
+    url = reverse('passwordentry-autofill')
+    assert len(api_client.get(url, {'url': 'example.com'}).data['results']) == 10
+    assert len(api_client.get(url, {'url': 'example.com', 'limit': 3}).data['results']) == 3
+    assert api_client.get(url, {'url': 'example.com', 'limit': 500}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_autofill_ignora_origenes_no_web(api_client, test_user):
+    crear(test_user, "Script", "javascript:alert(1)")
+    crear(test_user, "Sufijo", "https://co.uk")
+    crear(test_user, "Correo", "mailto:alice@example.com")
+
+    assert set(PasswordEntry.objects.values_list('service_domain', flat=True)) == {''}
+    for url in ('javascript:void(0)', 'https://co.uk', 'mailto:bob@example.com'):
+        assert api_client.get(reverse('passwordentry-autofill'), {'url': url}).status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migracion_0014_recalcula_con_la_lista_fijada():
+    executor = MigrationExecutor(connection)
+    executor.migrate([('backend', '0013_passwordentry_title_created_indexes')])
+    old_apps = executor.loader.project_state([('backend', '0013_passwordentry_title_created_indexes')]).apps
+    User = old_apps.get_model('backend', 'User')
+    Entry = old_apps.get_model('backend', 'PasswordEntry')
+    user = User.objects.create(username='pslmig', email='pslmig@gmail.com', password='x')
+    # Dominios con la heurística anterior de dos niveles
+    filas = {
+        "https://alice.github.io": ("github.io", "alice.github.io"),
+        "javascript:alert(1)": ("javascript", ""),
+        "https://mail.google.com": ("google.com", "google.com"),
+    }
+    for url, (antiguo, _) in filas.items():
+        Entry.objects.create(user=user, title=url, service_url=url, service_domain=antiguo)
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+    assert dict(PasswordEntry.objects.values_list('service_url', 'service_domain')) == {
+        url: nuevo for url, (_, nuevo) in filas.items()
+    }
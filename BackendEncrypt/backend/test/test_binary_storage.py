@@ -0,0 +1,46 @@
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from backend.ciphers import FernetCipher, make_cipher
+
+BEFORE = [('backend', '0009_passwordentry_encrypted_blob')]
+AFTER = [('backend', '0011_passwordentry_encrypted_pass_binary')]
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_pasa_tokens_de_texto_a_bytes(settings):
+    key = Fernet.generate_key()
+    old_apps = migrate(BEFORE)
+    User = old_apps.get_model('backend', 'User')
+    PasswordEntry = old_apps.get_model('backend', 'PasswordEntry')
+    user = User.objects.create(username='binuser', email='bin@gmail.com', password='x')
+    token = Fernet(key).encrypt(b"antigua").decode()
+    entry = PasswordEntry.objects.create(user=user, title="Legacy", encrypted_pass=token)
+
+    new_apps = migrate(AFTER)
+    blob = new_apps.get_model('backend', 'PasswordEntry').objects.get(pk=entry.pk).encrypted_pass
+    assert bytes(blob) == base64.urlsafe_b64decode(token)
+    assert len(blob) < len(token)
+    assert make_cipher(key).decrypt(blob) == b"antigua"
+
+    # Vuelta atrás: se recupera el token en base64 original
+    old_apps = migrate(BEFORE)
+    assert old_apps.get_model('backend', 'PasswordEntry').objects.get(pk=entry.pk).encrypted_pass == token
+    migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+
+def test_tokens_binarios_sin_base64():
+    token = make_cipher(Fernet.generate_key()).encrypt(b"200211")
+    assert isinstance(token, bytes)
+    assert token[0] != FernetCipher.version
@@ -0,0 +1,108 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='bulkuser',
+        email='bulk@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.fixture
+def entries(test_user):
+    creadas = []
+    for i in range(2):
+        entry = PasswordEntry(user=test_user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+        creadas.append(entry)
+    return creadas
+
+
+@pytest.mark.django_db
+def test_bulk_create_update_delete(api_client, test_user, entries):
+    antes = entries[0].updated_at
+    operations = [
+        {"op": "create", "title": "Nueva", "raw_password": "nueva123"},
+        {"op": "update", "id": entries[0].id, "title": "Cambiada", "raw_password": "cambiada123"},
+        {"op": "delete", "id": entries[1].id},
+    ]
+
+    response = api_client.post(reverse('passwordentry-bulk'), {"operations": operations}, format='json')
+
+    assert response.status_code == 200
+    assert [r['status'] for r in response.data['results']] == [201, 200, 204]
+
+    nueva = PasswordEntry.objects.get(id=response.data['results'][0]['id'])
+    assert nueva.user == test_user
+    assert nueva.get_password() == "nueva123"
+
+    cambiada = PasswordEntry.objects.get(id=entries[0].id)
+    assert cambiada.title == "Cambiada"
+    assert cambiada.get_password() == "cambiada123"
+    assert cambiada.updated_at > antes
+
+    assert not PasswordEntry.objects.filter(id=entries[1].id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_invalido_no_guarda_nada(api_client, entries):
+    operations = [
+        {"op": "create", "title": "Sin password"},
+        {"op": "delete", "id": entries[0].id},
+        {"op": "update", "id": 999999, "title": "No existe"},
+    ]
+
+    response = api_client.post(reverse('passwordentry-bulk'), {"operations": operations}, format='json')
+
+    assert response.status_code == 400
+    estados = [r.get('status') for r in response.data['results']]
+    assert estados == [400, None, 404]
+    assert PasswordEntry.objects.filter(id=entries[0].id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_no_toca_entradas_ajenas(api_client):
+    otro = User.objects.create_user(username='otro', email='otro@gmail.com', password='x')
+    ajena = PasswordEntry(user=otro, title="Ajena")
+    ajena.set_password("nope")
+    ajena.save()
+
+    response = api_client.post(
+        reverse('passwordentry-bulk'), {"operations": [{"op": "delete", "id": ajena.id}]}, format='json'
+    )
+
+    assert response.status_code == 400
+    assert PasswordEntry.objects.filter(id=ajena.id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_id_no_entero_es_400(api_client, entries):
+    operations = [
+        {"op": "delete", "id": [entries[0].id]},
+        {"op": "update", "id": {"pk": entries[1].id}, "title": "X"},
+        {"op": "delete", "id": True},
+    ]
+
+    response = api_client.post(reverse('passwordentry-bulk'), {"operations": operations}, format='json')
+
+    assert response.status_code == 400
+    assert [r['status'] for r in response.data['results']] == [400, 400, 400]
+    assert all('id' in r['errors'] for r in response.data['results'])
+    assert PasswordEntry.objects.filter(id__in=[e.id for e in entries]).count() == len(entries)
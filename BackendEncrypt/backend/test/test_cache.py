@@ -0,0 +1,84 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from backend import cache
+from backend.cache import DecryptedCache, decrypted_cache
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def cache_on(settings):
+    settings.DECRYPTED_CACHE_ENABLED = True
+    settings.DECRYPTED_CACHE_MAX_ENTRIES = 2
+    settings.DECRYPTED_CACHE_TTL = 30
+    decrypted_cache.clear()
+    yield
+    decrypted_cache.clear()
+
+
+@pytest.fixture
+def entry(db):
+    user = User.objects.create_user(username='cacheuser', email='cache@gmail.com', password='x')
+    entry = PasswordEntry(user=user, title="Entry")
+    entry.set_password("secret")
+    entry.save()
+    return entry
+
+
+def test_lru_expulsa_y_pone_a_cero(cache_on):
+    lru = DecryptedCache()
+    lru.set(1, 't', "uno")
+    valor = lru._data[1][2]
+    lru.set(2, 't', "dos")
+    lru.get(1, 't')
+    lru.set(3, 't', "tres")
+
+    assert lru.get(2, 't') is None
+    assert lru.get(1, 't') == "uno"
+    lru.invalidate(1)
+    assert valor == bytearray(3)
+
+
+def test_ttl_y_updated_at(cache_on, settings):
+    lru = DecryptedCache()
+    lru.set(1, 't1', "uno")
+    assert lru.get(1, 't2') is None
+    lru.set(1, 't1', "uno")
+    settings.DECRYPTED_CACHE_TTL = 0
+    lru.set(1, 't1', "uno")
+    assert lru.get(1, 't1') is None
+    assert lru.stats()['misses'] == 2
+
+
+@pytest.mark.django_db
+def test_lectura_repetida_no_descifra(cache_on, entry, monkeypatch):
+    assert entry.get_password() == "secret"
+
+    def falla(tokens):
+        raise AssertionError("debería salir de la caché")
+
+    monkeypatch.setattr(cache, 'decrypt_many', falla)
+    assert PasswordEntry.objects.get(pk=entry.pk).get_password() == "secret"
+    assert decrypted_cache.stats()['hits'] == 1
+
+
+@pytest.mark.django_db
+def test_save_y_delete_invalidan(cache_on, entry):
+    entry.get_password()
+    entry.set_password("nuevo")
+    entry.save()
+    assert decrypted_cache.stats()['size'] == 0
+    assert PasswordEntry.objects.get(pk=entry.pk).get_password() == "nuevo"
+
+    entry.delete()
+    assert decrypted_cache.stats()['size'] == 0
+
+
+@pytest.mark.django_db
+def test_desactivada_no_guarda(entry, settings):
+    settings.DECRYPTED_CACHE_ENABLED = False
+    decrypted_cache.clear()
+    entry.get_password()
+    assert decrypted_cache.stats() == {'hits': 0, 'misses': 0, 'size': 0}
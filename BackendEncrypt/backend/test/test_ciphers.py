@@ -0,0 +1,85 @@
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from django.contrib.auth import get_user_model
+
+from backend.ciphers import AESGCMCipher, BaseCipher, ChaCha20Cipher, FernetCipher, make_cipher, token_version
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+KEY = Fernet.generate_key()
+BACKENDS = [FernetCipher, AESGCMCipher, ChaCha20Cipher]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cifra_y_descifra(backend):
+    cipher = backend(KEY)
+    token = cipher.encrypt(b"secreto")
+    assert token_version(token) == backend.version
+    assert cipher.decrypt(token) == b"secreto"
+
+
+@pytest.mark.parametrize("backend", [AESGCMCipher, ChaCha20Cipher])
+def test_aead_rechaza_token_alterado(backend):
+    token = bytearray(backend(KEY).encrypt(b"secreto"))
+    token[-3] ^= 0x01
+    with pytest.raises(InvalidToken):
+        backend(KEY).decrypt(bytes(token))
+
+
+def test_aead_es_mas_compacto_que_fernet():
+    assert len(AESGCMCipher(KEY).encrypt(b"200211")) < len(FernetCipher(KEY).encrypt(b"200211")) / 2
+
+
+def test_descifra_memoryview():
+    token = AESGCMCipher(KEY).encrypt(b"secreto")
+    assert make_cipher(KEY).decrypt(memoryview(token)) == b"secreto"
+    assert make_cipher(KEY).decrypt(memoryview(FernetCipher(KEY).encrypt(b"antiguo"))) == b"antiguo"
+
+
+def test_descifra_cualquier_version(settings):
+    settings.PASSWORD_CIPHER_BACKEND = "backend.ciphers.AESGCMCipher"
+    cipher = make_cipher(KEY)
+    fernet_token = FernetCipher(KEY).encrypt(b"antiguo")
+    assert cipher.decrypt(fernet_token) == b"antiguo"
+    assert cipher.decrypt(ChaCha20Cipher(KEY).encrypt(b"otro")) == b"otro"
+    assert token_version(cipher.encrypt(b"nuevo")) == AESGCMCipher.version
+
+
+def test_clave_distinta_no_descifra():
+    token = AESGCMCipher(KEY).encrypt(b"secreto")
+    with pytest.raises(InvalidToken):
+        AESGCMCipher(Fernet.generate_key()).decrypt(token)
+
+
+@pytest.mark.django_db
+def test_filas_fernet_siguen_descifrando_tras_cambiar_backend(settings):
+    settings.PASSWORD_CIPHER_BACKEND = "backend.ciphers.FernetCipher"
+    user = User.objects.create_user(username='cipheruser', email='cipher@gmail.com', password='x')
+    entry = PasswordEntry(user=user, title="Legacy")
+    entry.set_password("antigua")
+    entry.save()
+    assert token_version(entry.encrypted_pass) == FernetCipher.version
+
+    settings.PASSWORD_CIPHER_BACKEND = "backend.ciphers.AESGCMCipher"
+    entry = PasswordEntry.objects.get(pk=entry.pk)
+    assert entry.get_password() == "antigua"
+
+    entry.set_password("nueva")
+    entry.save()
+    assert token_version(entry.encrypted_pass) == AESGCMCipher.version
+    assert PasswordEntry.objects.get(pk=entry.pk).get_password() == "nueva"
+
+
+def test_backend_incompleto_no_se_instancia():
+    class SoloCifra(BaseCipher):
+        version = 0x7f
+
+        def __init__(self, key):
+            pass
+
+        def encrypt(self, data):
+            return data
+
+    with pytest.raises(TypeError):
+        SoloCifra(KEY)
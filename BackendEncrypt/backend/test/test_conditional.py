@@ -0,0 +1,94 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='etaguser',
+        email='etag@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.fixture
+def entry(test_user):
+    entry = PasswordEntry(user=test_user, title="Entry")
+    entry.set_password("secret")
+    entry.save()
+    return entry
+
+
+def sin_descifrar(monkeypatch):
+    def falla(*args, **kwargs):
+        raise AssertionError("un 304 no debe descifrar")
+
+    monkeypatch.setattr('backend.serializer.decrypt_entries', falla)
+    monkeypatch.setattr(PasswordEntry, 'get_password', falla)
+
+
+@pytest.mark.django_db
+def test_list_if_none_match(api_client, entry, monkeypatch):
+    url = reverse('passwordentry-list')
+    first = api_client.get(url)
+    assert first.status_code == 200
+    assert first['ETag']
+    assert 'Authorization' in first['Vary']
+
+    sin_descifrar(monkeypatch)
+    second = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert second.status_code == 304
+    assert second['ETag'] == first['ETag']
+
+
+@pytest.mark.django_db
+def test_list_etag_cambia_al_escribir(api_client, test_user, entry):
+    url = reverse('passwordentry-list')
+    etag = api_client.get(url)['ETag']
+
+    nueva = PasswordEntry(user=test_user, title="Otra")
+    nueva.set_password("x")
+    nueva.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    etag = api_client.get(url)['ETag']
+    nueva.delete()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_if_modified_since(api_client, entry, monkeypatch):
+    url = reverse('passwordentry-detail', args=[entry.id])
+    first = api_client.get(url)
+    assert first.status_code == 200
+
+    sin_descifrar(monkeypatch)
+    second = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+    assert second.status_code == 304
+
+
+@pytest.mark.django_db
+def test_detail_etag_depende_del_modo(api_client, entry):
+    url = reverse('passwordentry-detail', args=[entry.id])
+    full = api_client.get(url)['ETag']
+    metadata = api_client.get(url + '?mode=metadata')['ETag']
+    assert full != metadata
+
+
+@pytest.mark.django_db
+def test_detail_inexistente(api_client):
+    assert api_client.get(reverse('passwordentry-detail', args=[999])).status_code == 404
+    assert api_client.get('/api/passwords/abc/').status_code == 404
@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="perfil SQLite")
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_pragmas_de_la_conexion(settings):
+    assert pragma('synchronous') == 1  # NORMAL
+    assert pragma('busy_timeout') == settings.DB_SQLITE_TIMEOUT * 1000
+    assert pragma('temp_store') == 2  # MEMORY
+    assert pragma('cache_size') < 0
+
+
+def test_escrituras_piden_el_lock_al_empezar():
+    assert connection.transaction_mode == 'IMMEDIATE'
+
+
+@pytest.mark.django_db
+def test_wal_en_base_de_datos_en_disco(tmp_path):
+    # La BD de tests es en memoria (sin WAL): se comprueba con una conexión a disco
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(tmp_path / 'wal.sqlite3')}, alias='wal')
+    try:
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+    finally:
+        wrapper.close()
@@ -16,7 +16,7 @@ def test_crear_password_entry_benchmark(benchmark):
         )
         create_entry.set_password(raw_password)
         create_entry.save()
+        return create_entry
 
-        benchmark(create_entry)
-
-    
\ No newline at end of file
+    entry = benchmark(create_password_entry)
+    assert entry.get_password() == raw_password
@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from backend.ciphers import make_cipher
+from backend.keys import USER_KEY_ID, DataKeyMissing, data_key_cache, get_user_data_key
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def envelope(settings):
+    settings.ENVELOPE_ENCRYPTION = True
+    settings.FERNET_KEYS = [("v1", OLD_KEY)]
+    data_key_cache.clear()
+    yield
+    data_key_cache.clear()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(username='envuser', email='env@gmail.com', password='x')
+
+
+@pytest.mark.django_db
+def test_entradas_con_clave_de_usuario(envelope, test_user):
+    entry = PasswordEntry(user=test_user, title="Entry")
+    entry.set_password("secret")
+    entry.save()
+
+    test_user.refresh_from_db()
+    assert entry.key_id == USER_KEY_ID
+    assert test_user.wrapped_data_key
+    assert PasswordEntry.objects.get(pk=entry.pk).get_password() == "secret"
+    # La DEK no descifra con la clave maestra
+    with pytest.raises(InvalidToken):
+        make_cipher(OLD_KEY).decrypt(entry.encrypted_pass)
+
+
+@pytest.mark.django_db
+def test_dek_se_crea_una_vez_y_se_cachea(envelope, test_user):
+    first = get_user_data_key(test_user.pk)
+    wrapped = User.objects.get(pk=test_user.pk).wrapped_data_key
+
+    data_key_cache.clear()
+    second = get_user_data_key(test_user.pk)
+    get_user_data_key(test_user.pk)
+
+    assert User.objects.get(pk=test_user.pk).wrapped_data_key == wrapped
+    token = first.encrypt(b"x")
+    assert second.decrypt(token) == b"x"
+    assert data_key_cache.stats()['hits'] == 1
+
+
+@pytest.mark.django_db
+def test_dek_borrada_con_entradas_no_se_regenera(envelope, test_user):
+    entry = PasswordEntry(user=test_user, title="Entry")
+    entry.set_password("secret")
+    entry.save()
+
+    User.objects.filter(pk=test_user.pk).update(wrapped_data_key='')
+    data_key_cache.clear()
+
+    with pytest.raises(DataKeyMissing):
+        get_user_data_key(test_user.pk)
+    # No se ha generado otra DEK que dejaría las entradas sin poder descifrarse
+    assert User.objects.get(pk=test_user.pk).wrapped_data_key == ''
+
+
+@pytest.mark.django_db
+def test_rewrap_no_toca_las_entradas(envelope, test_user, settings):
+    entry = PasswordEntry(user=test_user, title="Entry")
+    entry.set_password("secret")
+    entry.save()
+    ciphertext = entry.encrypted_pass
+
+    settings.FERNET_KEYS = [("v2", NEW_KEY), ("v1", OLD_KEY)]
+    call_command('rewrap_data_keys', stdout=StringIO())
+
+    settings.FERNET_KEYS = [("v2", NEW_KEY)]
+    data_key_cache.clear()
+    reloaded = PasswordEntry.objects.get(pk=entry.pk)
+    assert bytes(reloaded.encrypted_pass) == bytes(ciphertext)
+    assert reloaded.get_password() == "secret"
+
+
+@pytest.mark.django_db
+def test_filas_antiguas_siguen_con_la_maestra(test_user, settings):
+    settings.FERNET_KEYS = [("v1", OLD_KEY)]
+    entry = PasswordEntry(user=test_user, title="Antigua")
+    entry.set_password("secret")
+    entry.save()
+
+    settings.ENVELOPE_ENCRYPTION = True
+    assert PasswordEntry.objects.get(pk=entry.pk).get_password() == "secret"
+    assert entry.key_id == "v1"
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.export import iter_export_chunks
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='exportuser',
+        email='export@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.fixture
+def entries(test_user):
+    for i in range(5):
+        entry = PasswordEntry(user=test_user, title=f"Entry {i}", notes=f"nota {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+
+
+@pytest.mark.django_db
+def test_export_ndjson(api_client, entries):
+    response = api_client.get(reverse('passwordentry-export'))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row['password'] for row in rows] == [f"secret{i}" for i in range(5)]
+    assert 'encrypted_pass' not in rows[0]
+
+
+@pytest.mark.django_db
+def test_export_json(api_client, entries):
+    response = api_client.get(reverse('passwordentry-export') + '?output=json')
+
+    assert response['Content-Type'] == 'application/json'
+    rows = json.loads(b''.join(response.streaming_content))
+    assert len(rows) == 5
+    assert rows[0]['notes'] == "nota 0"
+
+
+@pytest.mark.django_db
+def test_export_json_vacio(api_client):
+    response = api_client.get(reverse('passwordentry-export') + '?output=json')
+    assert json.loads(b''.join(response.streaming_content)) == []
+
+
+@pytest.mark.django_db
+def test_export_por_bloques(test_user, entries):
+    chunks = list(iter_export_chunks(PasswordEntry.objects.filter(user=test_user), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+from backend import hashers
+
+User = get_user_model()
+
+TOKEN_URL = '/api/api/token/'
+PASSWORD = 'testpassword123'
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(username='hashuser', email='hash@gmail.com', password=PASSWORD)
+
+
+def login(password=PASSWORD):
+    return APIClient().post(TOKEN_URL, {'email': 'hash@gmail.com', 'password': password}, format='json')
+
+
+@pytest.mark.django_db
+def test_hash_argon2id_con_costes_de_settings(test_user, settings):
+    hasher = identify_hasher(test_user.password)
+    assert hasher.algorithm == 'argon2'
+    assert test_user.password.startswith('argon2$argon2id$')
+    assert f'm={settings.PASSWORD_ARGON2_MEMORY_COST},t={settings.PASSWORD_ARGON2_TIME_COST}' in test_user.password
+
+
+@pytest.mark.django_db
+def test_login_emite_tokens(test_user):
+    response = login()
+    assert response.status_code == 200
+    assert {'access', 'refresh'} <= response.data.keys()
+    assert login('incorrecta').status_code == 401
+
+
+@pytest.mark.django_db
+def test_cuenta_inexistente_hashea_igual(test_user, monkeypatch):
+    calls = []
+    monkeypatch.setattr(hashers, 'run_hashing', lambda func, *args: calls.append(func) or func(*args))
+    response = APIClient().post(TOKEN_URL, {'email': 'nadie@gmail.com', 'password': PASSWORD}, format='json')
+    assert response.status_code == 401
+    assert len(calls) == 1  # se ha pasado por el pool como con una cuenta real
+
+
+@pytest.mark.django_db
+def test_rehash_desde_pbkdf2_al_hacer_login(test_user):
+    User.objects.filter(pk=test_user.pk).update(password=make_password(PASSWORD, hasher='pbkdf2_sha256'))
+
+    assert login('incorrecta').status_code == 401
+    assert User.objects.get(pk=test_user.pk).password.startswith('pbkdf2_sha256$')
+
+    assert login().status_code == 200
+    assert User.objects.get(pk=test_user.pk).password.startswith('argon2$argon2id$')
+
+
+@pytest.mark.django_db
+def test_rehash_al_cambiar_costes(test_user, settings):
+    settings.PASSWORD_ARGON2_TIME_COST = settings.PASSWORD_ARGON2_TIME_COST + 1
+    assert login().status_code == 200
+    assert f't={settings.PASSWORD_ARGON2_TIME_COST}' in User.objects.get(pk=test_user.pk).password
+
+
+@pytest.mark.django_db
+def test_pool_lleno_responde_503(test_user, settings, monkeypatch):
+    hashers.get_hash_executor()
+    monkeypatch.setattr(hashers, '_slots', threading.BoundedSemaphore(1))
+    hashers._slots.acquire()
+    settings.PASSWORD_HASH_QUEUE_TIMEOUT = 0.01
+
+    response = login()
+    assert response.status_code == 503
+    assert response.data['detail'].code == 'login_busy'
+
+
+@pytest.mark.django_db
+def test_login_async(test_user):
+    client = AsyncClient()
+    response = async_to_sync(client.post)(
+        '/api/async/token/', {'email': 'hash@gmail.com', 'password': PASSWORD}, content_type='application/json'
+    )
+    assert response.status_code == 200
+    assert 'access' in response.json()
+
+    response = async_to_sync(client.post)(
+        '/api/async/token/', {'email': 'hash@gmail.com', 'password': 'incorrecta'}, content_type='application/json'
+    )
+    assert response.status_code == 401
@@ -0,0 +1,117 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from backend import bulk
+from backend.models import ImportCheckpoint, PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='importuser',
+        email='import@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.mark.django_db
+def test_import_ndjson_por_bloques(test_user, tmp_path):
+    path = tmp_path / "vault.ndjson"
+    rows = [{"title": f"Entry {i}", "password": f"secret{i}", "url": "https://example.com"} for i in range(5)]
+    rows.append({"title": "Sin password"})
+    path.write_text('\n'.join(json.dumps(row) for row in rows))
+
+    out, err = StringIO(), StringIO()
+    call_command('import_vault', str(path), user=test_user.email, chunk_size=2, stdout=out, stderr=err)
+
+    entries = PasswordEntry.objects.filter(user=test_user).order_by('id')
+    assert [e.get_password() for e in entries] == [f"secret{i}" for i in range(5)]
+    assert entries[0].service_url == "https://example.com"
+    assert "1 omitidas" in out.getvalue()
+    assert "Registro 6 omitido" in err.getvalue()
+    assert ImportCheckpoint.objects.get(user=test_user, name=str(path)).done == 6
+
+
+@pytest.mark.django_db
+def test_import_csv_resume(test_user, tmp_path):
+    path = tmp_path / "bitwarden.csv"
+    lines = ["name,login_username,login_password,notes"]
+    lines += [f"Entry {i},user{i},secret{i},nota {i}" for i in range(4)]
+    path.write_text('\n'.join(lines) + '\n')
+    # Simula una ejecución anterior que confirmó los dos primeros registros
+    ImportCheckpoint.objects.create(user=test_user, name=str(path), done=2)
+
+    call_command('import_vault', str(path), user=test_user.email, resume=True, stdout=StringIO())
+
+    entries = PasswordEntry.objects.filter(user=test_user).order_by('id')
+    assert [e.title for e in entries] == ["Entry 2", "Entry 3"]
+    assert entries[0].username == "user2"
+    assert entries[0].notes == "nota 2"
+
+
+@pytest.mark.django_db
+def test_import_lineas_ilegibles_se_omiten(test_user, tmp_path):
+    path = tmp_path / "roto.ndjson"
+    path.write_text('\n'.join([
+        json.dumps({"title": "Buena", "password": "secret"}),
+        '{"title": "Cortada", ',
+        '["no", "es", "un", "objeto"]',
+        json.dumps({"title": "Otra", "password": "secret2"}),
+    ]))
+
+    out, err = StringIO(), StringIO()
+    call_command('import_vault', str(path), user=test_user.email, stdout=out, stderr=err)
+
+    assert list(PasswordEntry.objects.filter(user=test_user).order_by('id').values_list('title', flat=True)) == [
+        "Buena", "Otra",
+    ]
+    assert "Registro 2 omitido" in err.getvalue()
+    assert "Registro 3 omitido" in err.getvalue()
+    assert "2 omitidas" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_fallo_a_medias_no_duplica_al_reanudar(test_user, tmp_path, monkeypatch):
+    path = tmp_path / "vault.ndjson"
+    path.write_text('\n'.join(json.dumps({"title": f"Entry {i}", "password": f"secret{i}"}) for i in range(4)))
+
+    original = bulk.bulk_create_entries
+    llamadas = []
+
+    def falla_en_el_segundo_bloque(user_id, rows):
+        llamadas.append(rows)
+        created = original(user_id, rows)
+        if len(llamadas) == 2:
+            raise RuntimeError("corte")
+        return created
+
+    monkeypatch.setattr('backend.management.commands.import_vault.bulk_create_entries', falla_en_el_segundo_bloque)
+    with pytest.raises(RuntimeError):
+        call_command('import_vault', str(path), user=test_user.email, chunk_size=2, stdout=StringIO())
+    # El segundo bloque y su progreso se deshacen juntos
+    assert ImportCheckpoint.objects.get(user=test_user, name=str(path)).done == 2
+    assert PasswordEntry.objects.filter(user=test_user).count() == 2
+
+    monkeypatch.undo()
+    call_command('import_vault', str(path), user=test_user.email, chunk_size=2, resume=True, stdout=StringIO())
+    assert list(PasswordEntry.objects.filter(user=test_user).order_by('id').values_list('title', flat=True)) == [
+        f"Entry {i}" for i in range(4)
+    ]
+
+
+@pytest.mark.django_db
+def test_import_csv_con_bom(test_user, tmp_path):
+    path = tmp_path / "excel.csv"
+    path.write_bytes(b"\xef\xbb\xbf" + "title,username,password\r\nBanco,ana,secreto\r\n".encode())
+
+    call_command('import_vault', str(path), user=test_user.email, stdout=StringIO())
+
+    entry = PasswordEntry.objects.get(user=test_user)
+    assert entry.title == "Banco"
+    assert entry.get_password() == "secreto"
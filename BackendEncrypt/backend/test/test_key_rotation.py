@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from cryptography.fernet import Fernet
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def entries(db, settings):
+    settings.FERNET_KEYS = [("v1", OLD_KEY)]
+    user = User.objects.create_user(username='rotuser', email='rot@gmail.com', password='x')
+    creadas = []
+    for i in range(5):
+        entry = PasswordEntry(user=user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+        creadas.append(entry)
+    return creadas
+
+
+@pytest.mark.django_db
+def test_claves_antiguas_siguen_descifrando(entries, settings):
+    settings.FERNET_KEYS = [("v2", NEW_KEY), ("v1", OLD_KEY)]
+
+    entry = PasswordEntry.objects.get(pk=entries[0].pk)
+    assert entry.key_id == "v1"
+    assert entry.get_password() == "secret0"
+
+    entry.set_password("nuevo")
+    assert entry.key_id == "v2"
+
+
+@pytest.mark.django_db
+def test_rotate_keys_por_lotes_y_reanudable(entries, settings):
+    settings.FERNET_KEYS = [("v2", NEW_KEY), ("v1", OLD_KEY)]
+    updated_at = {e.pk: e.updated_at for e in PasswordEntry.objects.all()}
+
+    call_command('rotate_keys', batch_size=2, limit=3, stdout=StringIO())
+    assert PasswordEntry.objects.filter(key_id="v2").count() == 3
+
+    call_command('rotate_keys', batch_size=2, stdout=StringIO())
+    assert PasswordEntry.objects.filter(key_id="v1").count() == 0
+
+    # Sin la clave antigua todo sigue descifrando y updated_at no se tocó
+    settings.FERNET_KEYS = [("v2", NEW_KEY)]
+    expected = {entry.pk: f"secret{i}" for i, entry in enumerate(entries)}
+    for entry in PasswordEntry.objects.all():
+        assert entry.get_password() == expected[entry.pk]
+        assert entry.updated_at == updated_at[entry.pk]
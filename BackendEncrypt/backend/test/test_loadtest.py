@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+import random
+
+from django.contrib.auth import get_user_model
+from django.urls import resolve
+
+from loadtest import (
+    CSV_FIELDS, LoadTestConfig, Vault, build_request, describe, parse_weights, percentile, run_load_test, write_csv,
+)
+
+MIX = {'list': 3, 'reveal': 3, 'create': 2, 'update': 1, 'delete': 1, 'login': 1}
+
+
+def test_percentiles_y_estadisticas():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(0.0505)
+    assert percentile(values, 99) == pytest.approx(0.09901)
+    stats = describe(values)
+    assert stats['rounds'] == 100
+    assert stats['ops'] == pytest.approx(1 / stats['mean'])
+    assert stats['min'] <= stats['median'] <= stats['p95'] <= stats['p99'] <= stats['max']
+
+
+def test_parse_weights():
+    assert parse_weights('list=40,reveal=25') == {'list': 40.0, 'reveal': 25.0}
+    assert parse_weights('10:6,1000:1', int) == {10: 6.0, 1000: 1.0}
+
+
+# Las peticiones salen de otros hilos: necesitan ver los datos ya confirmados
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("server", ['wsgi', 'asgi'])
+def test_carga_mixta(server, tmp_path):
+    config = LoadTestConfig(server=server, workers=2, requests=15, mix=MIX, vault_sizes={5: 1}, seed=1)
+    result = run_load_test(config)
+
+    assert result.total == 30
+    assert result.errors == {}
+    assert result.throughput > 0
+
+    path = tmp_path / 'carga.csv'
+    write_csv(result, path)
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == CSV_FIELDS
+    assert {row['name'] for row in rows} >= {f'loadtest.py::{server}_mixed', f'loadtest.py::{server}_list'}
+    assert int(next(row for row in rows if row['name'].endswith('_mixed'))['rounds']) == 30
+    # Las bóvedas de la prueba no quedan en la base de datos
+    assert not get_user_model().objects.filter(email__startswith='load-').exists()
+
+
+@pytest.mark.parametrize("server", ['wsgi', 'asgi'])
+def test_rutas_por_servidor(server):
+    vault = Vault('load@example.com', [1, 2])
+    rng = random.Random(0)
+    for op in ('list', 'create', 'update', 'delete', 'login'):
+        _, _, path, _ = build_request(op, vault, rng, 8, server)
+        assert resolve(path).url_name.startswith('async-') == (server == 'asgi')
+    _, method, path, _ = build_request('reveal', vault, rng, 8, server)
+    assert method == 'get'
+    assert resolve(path).url_name == ('async-passwordentry-detail' if server == 'asgi' else 'passwordentry-reveal')
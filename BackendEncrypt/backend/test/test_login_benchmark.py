@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import aauthenticate, get_user_model
+
+User = get_user_model()
+
+CONCURRENCY = [1, 8, 32]
+
+
+@pytest.fixture
+def login_user(db):
+    return User.objects.create_user(username='benchlogin', email='benchlogin@gmail.com', password='200211')
+
+
+# Ráfagas de N logins simultáneos; logins/s = N * ops
+@pytest.mark.parametrize("concurrency", CONCURRENCY)
+@pytest.mark.benchmark(group="login")
+def test_login_throughput_benchmark(benchmark, login_user, concurrency):
+    async def storm():
+        return await asyncio.gather(*(
+            aauthenticate(None, email='benchlogin@gmail.com', password='200211') for _ in range(concurrency)
+        ))
+
+    users = benchmark(async_to_sync(storm))
+    assert all(user == login_user for user in users)
+    if benchmark.stats:
+        benchmark.extra_info['logins_per_second'] = concurrency / benchmark.stats.stats.mean
@@ -0,0 +1,162 @@
+import re
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.checks import metrics_token_check
+from backend.metrics import LATENCY_BUCKETS, Counter, Histogram, Metric, MetricsMiddleware, registry
+from backend.models import PasswordEntry
+from backend.profiling import _record_query
+from backend.serializer import CustomTokenObtainPairSerializer
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def metrics_on(settings):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_TOKEN = 'secreto'
+
+
+def get_metrics(token='secreto'):
+    return APIClient().get('/metrics', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@pytest.fixture
+def test_user(db):
+    user = User.objects.create_user(username='metricsuser', email='metrics@gmail.com', password='testpassword123')
+    for i in range(3):
+        entry = PasswordEntry(user=user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+    return user
+
+
+def sample(text, name, **labels):
+    """Valor de la serie `name` cuyas etiquetas incluyen `labels`."""
+    for line in text.splitlines():
+        match = re.match(rf'^{name}(?:\{{(.*)\}})? (\S+)$', line)
+        if not match:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(1) or ''))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(2))
+    return None
+
+
+def test_histograma_cubos_acumulados():
+    histogram = Histogram('latencia_seconds', 'Prueba.', ('op',))
+    for value in (0.0001, 0.002, 0.002, 5.0, 120.0):
+        histogram.labels('x').observe(value)
+    text = '\n'.join(histogram.expose())
+
+    assert sample(text, 'latencia_seconds_count', op='x') == 5
+    assert sample(text, 'latencia_seconds_bucket', op='x', le='+Inf') == 5
+    assert sample(text, 'latencia_seconds_sum', op='x') == pytest.approx(125.0041)
+    counts = [float(v) for v in re.findall(r'latencia_seconds_bucket\{.*\} (\S+)', text)]
+    assert counts == sorted(counts)  # acumulados: nunca decrecen
+    assert len(counts) == len(LATENCY_BUCKETS) + 1
+
+
+def test_cubos_logaritmicos():
+    ratios = {round(b / a, 6) for a, b in zip(LATENCY_BUCKETS, LATENCY_BUCKETS[1:])}
+    assert ratios == {round(2 ** 0.25, 6)}
+    assert LATENCY_BUCKETS[0] <= 0.0001 and LATENCY_BUCKETS[-1] >= 60
+
+
+def test_etiquetas_escapadas():
+    counter = Counter('errores_total', 'Prueba.', ('reason',))
+    counter.labels('con "comillas"\n').inc()
+    assert '{reason="con \\"comillas\\"\\n"} 1' in next(counter.expose())
+
+
+@pytest.mark.django_db
+def test_endpoint_metrics(test_user, metrics_on):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {CustomTokenObtainPairSerializer.get_token(test_user).access_token}')
+    assert client.get(reverse('passwordentry-list')).status_code == 200
+    client.credentials(HTTP_AUTHORIZATION='Bearer no-es-un-token')
+    assert client.get(reverse('passwordentry-list')).status_code == 401
+    APIClient().post(reverse('token_obtain_pair'), {'email': 'metrics@gmail.com', 'password': 'mala'}, format='json')
+
+    response = get_metrics()
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+
+    assert sample(text, 'http_request_duration_seconds_count', route='passwordentry-list', method='GET', status='2xx') == 1
+    assert sample(text, 'http_request_duration_seconds_count', route='passwordentry-list', status='4xx') == 1
+    assert sample(text, 'crypto_operation_duration_seconds_count', op='decrypt_many') == 1
+    assert sample(text, 'crypto_items_total', op='decrypt_many') == 3
+    assert sample(text, 'db_query_duration_seconds_count', kind='SELECT') >= 1
+    assert sample(text, 'auth_failures_total', reason='invalid_token') == 1
+    assert sample(text, 'auth_failures_total', reason='bad_credentials') == 1
+    assert sample(text, 'cache_requests_total', cache='token_state', result='miss') >= 1
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    # El propio /metrics no se mide
+    assert 'route="metrics"' not in text
+
+
+@pytest.mark.django_db
+def test_metrics_desactivadas_por_defecto(settings):
+    assert settings.METRICS_ENABLED is False
+    assert get_metrics().status_code == 404
+
+
+@pytest.mark.django_db
+def test_metrics_exige_token(settings):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_TOKEN = ''
+    assert APIClient().get('/metrics').status_code == 404
+    assert [error.id for error in metrics_token_check(None)] == ['backend.E001']
+
+    settings.METRICS_TOKEN = 'secreto'
+    assert metrics_token_check(None) == []
+    assert APIClient().get('/metrics').status_code == 401
+    assert get_metrics('otro').status_code == 401
+    assert get_metrics().status_code == 200
+
+
+@pytest.mark.django_db
+def test_metodos_inventados_no_crean_series(metrics_on):
+    client = APIClient()
+    for i in range(20):
+        client.generic(f'X{i}', reverse('passwordentry-list'))
+    text = get_metrics().content.decode()
+    methods = set(re.findall(r'http_request_duration_seconds_count\{[^}]*method="([^"]*)"', text))
+    assert methods == {'other'}
+
+
+def test_metric_sin_new_falla_al_crearse():
+    class Incompleta(Metric):
+        kind = 'gauge'
+
+    with pytest.raises(TypeError):
+        Incompleta('incompleta', 'Prueba.')
+
+
+@pytest.mark.benchmark(group="metricas")
+def test_observe_benchmark(benchmark):
+    # Coste por observación en el camino caliente
+    series = Histogram('bench_seconds', 'Prueba.', ('op',)).labels('x')
+    benchmark(series.observe, 0.0123)
+
+
+@pytest.mark.django_db
+def test_middleware_no_acumula_recolectores(metrics_on):
+    for _ in range(5):
+        MetricsMiddleware(lambda request: None)
+    connection.ensure_connection()
+    assert connection.execute_wrappers.count(_record_query) == 1
+    assert sum(1 for receiver in connection_created.receivers if receiver[0][0] == 'backend.profiling') == 1
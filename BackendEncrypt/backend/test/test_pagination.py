@@ -0,0 +1,69 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='pageuser',
+        email='page@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+def crear_entradas(user, total):
+    for i in range(total):
+        entry = PasswordEntry(user=user, title=f"Entry {i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+
+
+@pytest.mark.django_db
+def test_list_recorre_todas_las_paginas(api_client, test_user):
+    crear_entradas(test_user, 7)
+    # Todas con el mismo updated_at: el cursor debe desempatar por id
+    PasswordEntry.objects.update(updated_at=PasswordEntry.objects.first().updated_at)
+
+    url = reverse('passwordentry-list') + '?page_size=3'
+    vistos = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data['results']) <= 3
+        vistos.extend(item['id'] for item in response.data['results'])
+        url = response.data['next']
+
+    assert len(vistos) == 7
+    assert len(set(vistos)) == 7
+    assert vistos == sorted(vistos, reverse=True)
+
+
+@pytest.mark.django_db
+def test_list_pagina_anterior(api_client, test_user):
+    crear_entradas(test_user, 5)
+    url = reverse('passwordentry-list') + '?page_size=2'
+
+    primera = api_client.get(url).data
+    segunda = api_client.get(primera['next']).data
+    anterior = api_client.get(segunda['previous']).data
+
+    assert [e['id'] for e in anterior['results']] == [e['id'] for e in primera['results']]
+
+
+@pytest.mark.django_db
+def test_list_cursor_invalido(api_client):
+    response = api_client.get(reverse('passwordentry-list') + '?cursor=basura')
+    assert response.status_code == 404
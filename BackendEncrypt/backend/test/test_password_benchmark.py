@@ -1,6 +1,10 @@
 import pytest
+from django.contrib.auth import get_user_model
 
-from backend.utils import encrypt_password, decrypt_password
+from backend.keys import data_key_cache, get_user_data_key
+from backend.utils import encrypt_password, decrypt_password, encrypt_many, decrypt_many
+
+BATCH_SIZES = [10, 100, 1000]
 
 @pytest.mark.benchmark(group="cifrado")
 def test_encrypt_password(benchmark):
@@ -12,4 +16,84 @@ def test_decrypt_password_benchmark(benchmark):
     plain_password = "200211"
     encrypted_password = encrypt_password(plain_password)
     benchmark(decrypt_password, encrypted_password)
-    
\ No newline at end of file
+
+# Variantes por lotes: el bucle uno a uno frente a encrypt_many/decrypt_many
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+@pytest.mark.benchmark(group="cifrado-lote")
+def test_encrypt_loop_benchmark(benchmark, batch_size):
+    passwords = [f"200211-{i}" for i in range(batch_size)]
+    benchmark(lambda: [encrypt_password(p) for p in passwords])
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+@pytest.mark.benchmark(group="cifrado-lote")
+def test_encrypt_many_benchmark(benchmark, batch_size):
+    passwords = [f"200211-{i}" for i in range(batch_size)]
+    result = benchmark(encrypt_many, passwords)
+    assert len(result) == batch_size
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+@pytest.mark.benchmark(group="descifrado-lote")
+def test_decrypt_loop_benchmark(benchmark, batch_size):
+    tokens = encrypt_many([f"200211-{i}" for i in range(batch_size)])
+    benchmark(lambda: [decrypt_password(t) for t in tokens])
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+@pytest.mark.benchmark(group="descifrado-lote")
+def test_decrypt_many_benchmark(benchmark, batch_size):
+    passwords = [f"200211-{i}" for i in range(batch_size)]
+    tokens = encrypt_many(passwords)
+    result = benchmark(decrypt_many, tokens)
+    assert result == passwords
+
+
+# Cifrado en sobre frente a la clave maestra única (test_encrypt_password)
+@pytest.fixture
+def envelope_user(db):
+    data_key_cache.clear()
+    return get_user_model().objects.create_user(username='benchenv', email='benchenv@gmail.com', password='x')
+
+@pytest.mark.benchmark(group="cifrado")
+def test_encrypt_envelope_benchmark(benchmark, envelope_user):
+    plain_password = "200211"
+    benchmark(lambda: encrypt_password(plain_password, get_user_data_key(envelope_user.pk)))
+
+@pytest.mark.benchmark(group="descifrado")
+def test_decrypt_envelope_benchmark(benchmark, envelope_user):
+    encrypted_password = encrypt_password("200211", get_user_data_key(envelope_user.pk))
+    benchmark(lambda: get_user_data_key(envelope_user.pk).decrypt(encrypted_password))
+
+@pytest.mark.benchmark(group="sobre-desenvolver")
+def test_unwrap_data_key_benchmark(benchmark, envelope_user):
+    # Caso frío: sin caché hay que leer y descifrar la DEK del usuario
+    get_user_data_key(envelope_user.pk)
+
+    def cold():
+        data_key_cache.clear()
+        get_user_data_key(envelope_user.pk)
+
+    benchmark(cold)
+
+
+# Comparativa de backends (settings.PASSWORD_CIPHER_BACKEND) sobre una misma clave
+CIPHER_BACKENDS = ["FernetCipher", "AESGCMCipher", "ChaCha20Cipher"]
+
+@pytest.mark.parametrize("backend", CIPHER_BACKENDS)
+@pytest.mark.benchmark(group="backend-cifrado")
+def test_encrypt_backend_benchmark(benchmark, settings, backend):
+    settings.PASSWORD_CIPHER_BACKEND = f"backend.ciphers.{backend}"
+    benchmark(encrypt_password, "200211")
+
+@pytest.mark.parametrize("backend", CIPHER_BACKENDS)
+@pytest.mark.benchmark(group="backend-descifrado")
+def test_decrypt_backend_benchmark(benchmark, settings, backend):
+    settings.PASSWORD_CIPHER_BACKEND = f"backend.ciphers.{backend}"
+    encrypted_password = encrypt_password("200211")
+    benchmark(decrypt_password, encrypted_password)
+
+@pytest.mark.parametrize("backend", CIPHER_BACKENDS)
+@pytest.mark.benchmark(group="backend-descifrado-lote")
+def test_decrypt_many_backend_benchmark(benchmark, settings, backend):
+    settings.PASSWORD_CIPHER_BACKEND = f"backend.ciphers.{backend}"
+    passwords = [f"200211-{i}" for i in range(1000)]
+    tokens = encrypt_many(passwords)
+    assert benchmark(decrypt_many, tokens) == passwords
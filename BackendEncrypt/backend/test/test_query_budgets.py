@@ -0,0 +1,112 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.models import PasswordEntry
+from backend.profiling import current_profile
+from backend.test.test_async_views import JWTAsyncClient
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(username='budgetuser', email='budget@gmail.com', password='testpassword123')
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+def make_entries(user, count):
+    creadas = []
+    for i in range(count):
+        entry = PasswordEntry(user=user, title=f"Entry {i}", service_url=f"https://site{i}.example.com")
+        entry.set_password(f"secret{i}")
+        entry.save()
+        creadas.append(entry)
+    return creadas
+
+
+# Presupuesto por endpoint con 3 y con 30 entradas: si crece con el tamaño es un N+1
+BUDGETS = [
+    ('passwordentry-list', {}, 3),
+    ('passwordentry-list', {'mode': 'metadata'}, 3),
+    ('passwordentry-search', {'q': 'Entry'}, 2),
+    ('passwordentry-autofill', {'url': 'https://site1.example.com'}, 1),
+    ('passwordentry-changes', {}, 2),
+    ('user-list', {}, 1),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', [3, 30])
+@pytest.mark.parametrize('name, params, budget', BUDGETS)
+def test_presupuesto_de_consultas(api_client, test_user, query_budget, size, name, params, budget):
+    make_entries(test_user, size)
+    for i in range(size // 10):
+        User.objects.create_user(username=f'otro{i}', email=f'otro{i}@gmail.com', password='x')
+
+    with query_budget(budget):
+        response = api_client.get(reverse(name), params)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_presupuesto_de_operaciones_por_lote(api_client, test_user, query_budget):
+    entries = make_entries(test_user, 20)
+    with query_budget(1):
+        response = api_client.post(reverse('passwordentry-reveal-batch'), {'ids': [e.pk for e in entries]}, format='json')
+    assert response.status_code == 200
+    assert len(response.data['results']) == 20
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.REQUEST_PROFILING = True
+
+
+@pytest.mark.django_db
+def test_server_timing_y_log(profiling, test_user, caplog):
+    make_entries(test_user, 3)
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+
+    with caplog.at_level(logging.INFO, logger='backend.profiling'):
+        response = client.get(reverse('passwordentry-list'))
+
+    assert response.status_code == 200
+    timing = response['Server-Timing']
+    assert timing.startswith('db;dur=') and 'crypto;dur=' in timing and 'total;dur=' in timing
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['route'] == 'passwordentry-list'
+    assert record['status'] == 200
+    assert record['queries'] >= 1
+    assert record['crypto_ops'] == 3
+    assert current_profile() is None
+
+
+@pytest.mark.django_db
+def test_perfilado_desactivado_no_anade_cabecera(api_client, settings):
+    settings.REQUEST_PROFILING = False
+    response = api_client.get(reverse('passwordentry-list'))
+    assert 'Server-Timing' not in response
+
+
+@pytest.mark.django_db
+def test_server_timing_en_vistas_async(profiling, test_user):
+    make_entries(test_user, 2)
+    client = JWTAsyncClient(AccessToken.for_user(test_user))
+    response = async_to_sync(client.get)(reverse('async-passwordentry-list'))
+    assert response.status_code == 200
+    assert 'desc="2 ops"' in response['Server-Timing']
+    assert 'desc="0 queries"' not in response['Server-Timing']
@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from backend.models import PasswordEntry
+from backend.test.query_plans import assert_indexed_queries, bad_plan_lines
+
+User = get_user_model()
+
+pytestmark = pytest.mark.skipif(connection.vendor not in ('sqlite', 'postgresql'), reason="EXPLAIN por motor")
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(username='planuser', email='plan@gmail.com', password='testpassword123')
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.fixture
+def entries(test_user):
+    otro = User.objects.create_user(username='planotro', email='planotro@gmail.com', password='x')
+    creadas = []
+    for owner in (test_user, otro):
+        for i in range(5):
+            entry = PasswordEntry(user=owner, title=f"Entry {i}", service_url=f"https://site{i}.example.com")
+            entry.set_password(f"secret{i}")
+            entry.save()
+            creadas.append(entry)
+    return creadas[:5]
+
+
+def test_detecta_recorrido_completo(db):
+    assert bad_plan_lines('SELECT * FROM backend_passwordentry WHERE notes = \'x\'')
+    assert bad_plan_lines('SELECT * FROM backend_passwordentry WHERE user_id = 1 ORDER BY notes')
+
+
+# La búsqueda ordena por relevancia solo las coincidencias: ese orden es inevitable
+RANKED_SEARCH = (r'_fts\b', r'similarity\(')
+
+ENDPOINTS = [
+    ('get', 'passwordentry-list', {}, ()),
+    ('get', 'passwordentry-list', {'mode': 'metadata'}, ()),
+    ('get', 'passwordentry-search', {'q': 'Entry'}, RANKED_SEARCH),
+    ('get', 'passwordentry-autofill', {'url': 'https://site1.example.com/login'}, ()),
+    ('get', 'passwordentry-changes', {}, ()),
+    ('get', 'passwordentry-export', {}, ()),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('method, name, params, allow', ENDPOINTS)
+def test_endpoints_de_lista_usan_indices(api_client, entries, method, name, params, allow):
+    with assert_indexed_queries(allow):
+        response = getattr(api_client, method)(reverse(name), params)
+        if hasattr(response, 'streaming_content'):
+            b''.join(response.streaming_content)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_paginas_siguientes_usan_indices(api_client, entries):
+    first = api_client.get(reverse('passwordentry-list'), {'page_size': 2})
+    with assert_indexed_queries():
+        response = api_client.get(first.data['next'])
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_endpoints_de_detalle_usan_indices(api_client, entries):
+    entry = entries[0]
+    with assert_indexed_queries():
+        assert api_client.get(reverse('passwordentry-detail', args=[entry.pk])).status_code == 200
+        assert api_client.get(reverse('passwordentry-reveal', args=[entry.pk])).status_code == 200
+        response = api_client.post(
+            reverse('passwordentry-reveal-batch'), {'ids': [e.pk for e in entries]}, format='json'
+        )
+        assert response.status_code == 200
+        response = api_client.post(
+            reverse('passwordentry-bulk'),
+            {'operations': [{'op': 'update', 'id': entry.pk, 'title': 'Nuevo'}]},
+            format='json',
+        )
+        assert response.status_code == 200
+
+
+ORDERINGS = [
+    ('-updated_at', '-id'),  # listado y autocompletado
+    ('updated_at', 'id'),  # sincronización (índice recorrido al revés)
+    ('title', '-id'),  # búsqueda sin FTS
+    ('-created_at', '-id'),  # recientes primero
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ordering', ORDERINGS)
+def test_ordenes_por_usuario_tienen_indice(test_user, ordering):
+    queryset = PasswordEntry.objects.filter(user_id=test_user.pk).order_by(*ordering)[:50]
+    assert not bad_plan_lines(str(queryset.query))
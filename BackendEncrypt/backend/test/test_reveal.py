@@ -0,0 +1,80 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='revealuser',
+        email='reveal@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+@pytest.fixture
+def entries(test_user):
+    creadas = []
+    for i in range(3):
+        entry = PasswordEntry(user=test_user, title=f"Entry {i}", username=f"user{i}")
+        entry.set_password(f"secret{i}")
+        entry.save()
+        creadas.append(entry)
+    return creadas
+
+
+@pytest.mark.django_db
+def test_list_modo_metadata_no_descifra(api_client, entries, monkeypatch):
+    def falla(*args, **kwargs):
+        raise AssertionError("no se debe descifrar en modo metadata")
+
+    monkeypatch.setattr(PasswordEntry, 'get_password', falla)
+    response = api_client.get(reverse('passwordentry-list') + '?mode=metadata')
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == 3
+    assert 'decrypted_password' not in response.data['results'][0]
+    assert response.data['results'][0]['username'].startswith('user')
+
+
+@pytest.mark.django_db
+def test_reveal_detalle(api_client, entries):
+    response = api_client.get(reverse('passwordentry-reveal', args=[entries[1].id]))
+    assert response.status_code == 200
+    assert response.data == {'id': entries[1].id, 'decrypted_password': 'secret1'}
+
+
+@pytest.mark.django_db
+def test_reveal_por_lotes_ignora_ajenos(api_client, entries):
+    otro = User.objects.create_user(username='otro', email='otro@gmail.com', password='x')
+    ajena = PasswordEntry(user=otro, title="Ajena")
+    ajena.set_password("nope")
+    ajena.save()
+
+    response = api_client.post(
+        reverse('passwordentry-reveal-batch'),
+        {'ids': [entries[0].id, entries[2].id, ajena.id]},
+        format='json'
+    )
+
+    assert response.status_code == 200
+    reveladas = {item['id']: item['decrypted_password'] for item in response.data['results']}
+    assert reveladas == {entries[0].id: 'secret0', entries[2].id: 'secret2'}
+
+
+@pytest.mark.django_db
+def test_reveal_por_lotes_valida_ids(api_client):
+    response = api_client.post(reverse('passwordentry-reveal-batch'), {'ids': []}, format='json')
+    assert response.status_code == 400
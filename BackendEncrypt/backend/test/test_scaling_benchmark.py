@@ -0,0 +1,150 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.bulk import bulk_create_entries
+from backend.cache import decrypted_cache
+from backend.models import PasswordEntry
+from backend.utils import decrypt_many, encrypt_many
+
+User = get_user_model()
+
+# Curvas de escala: cada operación contra bóvedas de 10 a 100k entradas, con
+# varios tamaños de contraseña y de concurrencia. Las bóvedas mayores que
+# BENCHMARK_MAX_VAULT_SIZE (1000 por defecto) se saltan para que la suite normal
+# siga siendo rápida; con BENCHMARK_MAX_VAULT_SIZE=100000 se mide la curva entera.
+MAX_VAULT_SIZE = int(os.getenv("BENCHMARK_MAX_VAULT_SIZE", 1000))
+VAULT_SIZES = [
+    pytest.param(size, marks=pytest.mark.skipif(size > MAX_VAULT_SIZE, reason=f"BENCHMARK_MAX_VAULT_SIZE={MAX_VAULT_SIZE}"))
+    for size in [10, 100, 1_000, 10_000, 100_000]
+]
+PAYLOAD_SIZES = [16, 256, 4096]
+CONCURRENCY = [1, 4, 16]
+SEED_BATCH = 5000
+
+
+def make_secret(i, length):
+    return (f"{i}-" * length)[:length]
+
+
+def seed_vault(user, size, payload=16):
+    for start in range(0, size, SEED_BATCH):
+        bulk_create_entries(user.pk, [
+            {
+                'title': f'Entry {i}',
+                'username': f'user{i}',
+                'service_url': f'https://site{i}.example.com',
+                'raw_password': make_secret(i, payload),
+            }
+            for i in range(start, min(start + SEED_BATCH, size))
+        ])
+
+
+@pytest.fixture
+def scale_user(db):
+    decrypted_cache.clear()
+    return User.objects.create_user(username='benchscale', email='benchscale@gmail.com', password='x')
+
+
+@pytest.fixture
+def vault(scale_user, request):
+    """Bóveda de request.param entradas (parametrizar con indirect=True)."""
+    seed_vault(scale_user, request.param)
+    return scale_user
+
+
+@pytest.fixture
+def api_client(scale_user):
+    client = APIClient()
+    client.force_authenticate(user=scale_user)
+    return client
+
+
+def middle_entry_id(user):
+    ids = PasswordEntry.objects.filter(user=user).order_by('id').values_list('id', flat=True)
+    return ids[ids.count() // 2]
+
+
+@pytest.mark.parametrize("vault", VAULT_SIZES, indirect=True)
+@pytest.mark.benchmark(group="escala-list")
+def test_list_scaling_benchmark(benchmark, api_client, vault):
+    url = reverse('passwordentry-list')
+    response = benchmark(api_client.get, url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("vault", VAULT_SIZES, indirect=True)
+@pytest.mark.benchmark(group="escala-detail")
+def test_detail_scaling_benchmark(benchmark, api_client, vault):
+    url = reverse('passwordentry-detail', args=[middle_entry_id(vault)])
+    response = benchmark(api_client.get, url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("vault", VAULT_SIZES, indirect=True)
+@pytest.mark.benchmark(group="escala-create")
+def test_create_scaling_benchmark(benchmark, api_client, vault):
+    url = reverse('passwordentry-list')
+    data = {"title": "Nueva", "raw_password": "supersecret123"}
+    response = benchmark(api_client.post, url, data, format='json')
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize("vault", VAULT_SIZES, indirect=True)
+@pytest.mark.benchmark(group="escala-update")
+def test_update_scaling_benchmark(benchmark, api_client, vault):
+    url = reverse('passwordentry-detail', args=[middle_entry_id(vault)])
+    response = benchmark(api_client.patch, url, {"raw_password": "newsecret123"}, format='json')
+    assert response.status_code == 200
+
+
+# Cifrado y descifrado de la bóveda entera: lote = tamaño de bóveda, por tamaño de contraseña
+@pytest.mark.parametrize("payload", PAYLOAD_SIZES)
+@pytest.mark.parametrize("size", VAULT_SIZES)
+@pytest.mark.benchmark(group="escala-cifrado")
+def test_encrypt_scaling_benchmark(benchmark, size, payload):
+    passwords = [make_secret(i, payload) for i in range(size)]
+    assert len(benchmark(encrypt_many, passwords)) == size
+
+
+@pytest.mark.parametrize("payload", PAYLOAD_SIZES)
+@pytest.mark.parametrize("size", VAULT_SIZES)
+@pytest.mark.benchmark(group="escala-descifrado")
+def test_decrypt_scaling_benchmark(benchmark, size, payload):
+    passwords = [make_secret(i, payload) for i in range(size)]
+    tokens = encrypt_many(passwords)
+    assert benchmark(decrypt_many, tokens) == passwords
+
+
+# N peticiones de listado simultáneas, cada una en su hilo con su conexión;
+# los hilos tienen que ver la bóveda ya confirmada
+@pytest.mark.parametrize("concurrency", CONCURRENCY)
+@pytest.mark.benchmark(group="escala-concurrencia")
+@pytest.mark.django_db(transaction=True)
+def test_list_concurrency_benchmark(benchmark, scale_user, concurrency):
+    seed_vault(scale_user, min(1_000, MAX_VAULT_SIZE))
+    url = reverse('passwordentry-list')
+    clients = []
+    for _ in range(concurrency):
+        client = APIClient()
+        client.force_authenticate(user=scale_user)
+        clients.append(client)
+
+    def close_connection(barrier):
+        barrier.wait()  # uno por hilo: ninguno repite mientras otro no ha llegado
+        connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = benchmark(lambda: [r.status_code for r in executor.map(lambda c: c.get(url), clients)])
+        barrier = threading.Barrier(concurrency)
+        list(executor.map(close_connection, [barrier] * concurrency))
+
+    assert statuses == [200] * concurrency
+    if benchmark.stats:
+        benchmark.extra_info['requests_per_second'] = concurrency / benchmark.stats.stats.mean
@@ -0,0 +1,78 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from backend.bulk import bulk_create_entries
+from backend.models import PasswordEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='searchuser',
+        email='search@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+def crear(user, title, username='', service_url=''):
+    entry = PasswordEntry(user=user, title=title, username=username, service_url=service_url)
+    entry.set_password("secret")
+    entry.save()
+    return entry
+
+
+def buscar(api_client, q):
+    response = api_client.get(reverse('passwordentry-search'), {'q': q})
+    assert response.status_code == 200
+    return [item['title'] for item in response.data['results']]
+
+
+@pytest.mark.django_db
+def test_search_prefijo_y_ranking(api_client, test_user, monkeypatch):
+    crear(test_user, "Correo Google", service_url="https://mail.google.com")
+    crear(test_user, "Banco", username="google-fan")
+    crear(test_user, "Netflix")
+    monkeypatch.setattr(PasswordEntry, 'get_password', lambda self: pytest.fail("no debe descifrar"))
+
+    assert buscar(api_client, "goo") == ["Correo Google", "Banco"]
+    assert buscar(api_client, "net") == ["Netflix"]
+    assert buscar(api_client, "corr goo") == ["Correo Google"]
+    assert buscar(api_client, "nada") == []
+
+
+@pytest.mark.django_db
+def test_search_sigue_cambios(api_client, test_user):
+    entry = crear(test_user, "Viejo")
+    entry.title = "Nuevo"
+    entry.save()
+    assert buscar(api_client, "viejo") == []
+    assert buscar(api_client, "nuevo") == ["Nuevo"]
+
+    entry.delete()
+    assert buscar(api_client, "nuevo") == []
+
+    bulk_create_entries(test_user.pk, [{'title': "Importada", 'raw_password': "x"}])
+    assert buscar(api_client, "impor") == ["Importada"]
+
+
+@pytest.mark.django_db
+def test_search_solo_del_usuario(api_client):
+    otro = User.objects.create_user(username='otro', email='otro@gmail.com', password='x')
+    crear(otro, "Secreto ajeno")
+    assert buscar(api_client, "secreto") == []
+
+
+@pytest.mark.django_db
+def test_search_requiere_q(api_client):
+    assert api_client.get(reverse('passwordentry-search')).status_code == 400
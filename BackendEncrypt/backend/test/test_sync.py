@@ -0,0 +1,150 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from rest_framework.test import APIClient
+from django.core import signing
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from backend.models import DeletedPasswordEntry, PasswordEntry
+from backend.sync import WATERMARK_SALT
+
+User = get_user_model()
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(
+        username='syncuser',
+        email='sync@gmail.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def api_client(test_user):
+    client = APIClient()
+    client.force_authenticate(user=test_user)
+    return client
+
+
+def crear(user, title):
+    entry = PasswordEntry(user=user, title=title)
+    entry.set_password(f"{title}-secret")
+    entry.save()
+    return entry
+
+
+@pytest.mark.django_db
+def test_changes_incremental(api_client, test_user, settings):
+    settings.PASSWORD_SYNC_WATERMARK_LAG = 0
+    url = reverse('passwordentry-changes')
+    primera = crear(test_user, "primera")
+    borrada = crear(test_user, "borrada")
+
+    inicial = api_client.get(url).data
+    assert {e['id'] for e in inicial['changed']} == {primera.id, borrada.id}
+    assert inicial['deleted'] == []
+
+    nueva = crear(test_user, "nueva")
+    borrada_id = borrada.id
+    borrada.delete()
+
+    delta = api_client.get(url, {'since': inicial['watermark']}).data
+    assert [e['id'] for e in delta['changed']] == [nueva.id]
+    assert delta['changed'][0]['decrypted_password'] == "nueva-secret"
+    assert delta['deleted'] == [borrada_id]
+
+    vacio = api_client.get(url, {'since': delta['watermark'], 'mode': 'metadata'}).data
+    assert vacio['changed'] == []
+    assert vacio['deleted'] == []
+
+
+@pytest.mark.django_db
+def test_changes_marca_invalida(api_client):
+    response = api_client.get(reverse('passwordentry-changes'), {'since': '2024-01-01T00:00:00'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_borrar_usuario_no_deja_lapidas(test_user):
+    crear(test_user, "x")
+    test_user.delete()
+    assert DeletedPasswordEntry.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_borrar_usuarios_en_lote_no_deja_lapidas(test_user):
+    crear(test_user, "x")
+    User.objects.filter(pk=test_user.pk).delete()
+    assert DeletedPasswordEntry.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_changes_paginado_con_cursor(api_client, test_user, settings):
+    settings.PASSWORD_SYNC_WATERMARK_LAG = 0
+    url = reverse('passwordentry-changes')
+    viejas = [crear(test_user, f"vieja{i}") for i in range(2)]
+    inicial = api_client.get(url).data
+    assert inicial['next'] is None
+
+    nuevas = [crear(test_user, f"nueva{i}") for i in range(3)]
+    viejas_ids = [e.id for e in viejas]
+    for entry in viejas:
+        entry.delete()
+
+    paginas = []
+    response = api_client.get(url, {'since': inicial['watermark'], 'page_size': 2, 'mode': 'metadata'})
+    while True:
+        assert response.status_code == 200
+        paginas.append(response.data)
+        if response.data['next'] is None:
+            break
+        assert 'since=' not in response.data['next']
+        response = api_client.get(response.data['next'])
+
+    assert [len(p['changed']) + len(p['deleted']) for p in paginas] == [2, 2, 1]
+    assert {p['watermark'] for p in paginas} == {paginas[0]['watermark']}
+    assert [e['id'] for p in paginas for e in p['changed']] == [e.id for e in nuevas]
+    assert [i for p in paginas for i in p['deleted']] == viejas_ids
+    assert all('decrypted_password' not in e for p in paginas for e in p['changed'])
+
+
+@pytest.mark.django_db
+def test_changes_cursor_invalido(api_client):
+    response = api_client.get(reverse('passwordentry-changes'), {'cursor': 'falso'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_changes_marca_caducada_pide_resincronizar(api_client, settings):
+    settings.PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS = 30
+    vieja = signing.dumps((timezone.now() - timedelta(days=31)).isoformat(), salt=WATERMARK_SALT)
+    response = api_client.get(reverse('passwordentry-changes'), {'since': vieja})
+    assert response.status_code == 410
+
+
+@pytest.mark.django_db
+def test_borrado_masivo_inserta_lapidas_de_una_vez(api_client, test_user):
+    entradas = [crear(test_user, f"bulk{i}") for i in range(5)]
+    operaciones = [{'op': 'delete', 'id': e.id} for e in entradas]
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.post(reverse('passwordentry-bulk'), {'operations': operaciones}, format='json')
+    assert response.status_code == 200
+    inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT') and 'deletedpasswordentry' in q['sql']]
+    assert len(inserts) == 1
+    assert sorted(DeletedPasswordEntry.objects.values_list('entry_id', flat=True)) == sorted(e.id for e in entradas)
+
+
+@pytest.mark.django_db
+def test_prune_tombstones_borra_solo_las_antiguas(test_user, settings):
+    settings.PASSWORD_SYNC_TOMBSTONE_RETENTION_DAYS = 30
+    DeletedPasswordEntry.objects.create(user=test_user, entry_id=1, deleted_at=timezone.now() - timedelta(days=31))
+    reciente = DeletedPasswordEntry.objects.create(user=test_user, entry_id=2)
+    call_command('prune_tombstones', stdout=StringIO())
+    assert list(DeletedPasswordEntry.objects.values_list('id', flat=True)) == [reciente.id]
@@ -0,0 +1,107 @@
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.authentication import TOKEN_VERSION_CLAIM
+from backend.throttling import LoginRateThrottle
+
+User = get_user_model()
+
+PASSWORD = 'testpassword123'
+
+
+@pytest.fixture
+def test_user(db):
+    return User.objects.create_user(username='throttleuser', email='throttle@gmail.com', password=PASSWORD)
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(LoginRateThrottle, 'THROTTLE_RATES', {'login_ip': '5/min', 'login_account': '3/min'})
+
+
+def login(email='throttle@gmail.com', password=PASSWORD, ip='10.0.0.1', **extra):
+    return APIClient().post(
+        reverse('token_obtain_pair'), {'email': email, 'password': password}, format='json', REMOTE_ADDR=ip, **extra
+    )
+
+
+@pytest.mark.django_db
+def test_rutas_emiten_el_mismo_token(test_user):
+    for name in ('token_obtain_pair', 'token_obtain_pair_legacy'):
+        response = APIClient().post(reverse(name), {'email': 'throttle@gmail.com', 'password': PASSWORD}, format='json')
+        assert response.status_code == 200
+        token = AccessToken(response.data['access'])
+        assert token['username'] == 'throttleuser'
+        assert TOKEN_VERSION_CLAIM in token
+
+
+@pytest.mark.django_db
+def test_limite_por_cuenta_antes_de_hashear(test_user, rates):
+    for i in range(3):
+        assert login(password='incorrecta', ip=f'10.0.0.{i}').status_code == 401
+
+    with mock.patch('backend.hashers.verify_password') as verify:
+        response = login(ip='10.0.0.99')
+    assert response.status_code == 429
+    assert 'Retry-After' in response
+    verify.assert_not_called()
+
+    # Otra cuenta desde la misma IP sigue pudiendo entrar
+    User.objects.create_user(username='otra', email='otra@gmail.com', password=PASSWORD)
+    assert login(email='otra@gmail.com', ip='10.0.0.99').status_code == 200
+
+
+@pytest.mark.django_db
+def test_limite_por_ip(test_user, rates):
+    for i in range(5):
+        login(email=f'nadie{i}@gmail.com', password='x')
+    assert login().status_code == 429
+    assert login(ip='10.0.0.2').status_code == 200
+
+
+@pytest.mark.django_db
+def test_x_forwarded_for_falso_no_salta_el_limite(test_user, rates):
+    # Sin proxies de confianza la cabecera la pone el cliente: se ignora
+    for i in range(5):
+        login(email=f'nadie{i}@gmail.com', password='x', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+    assert login(HTTP_X_FORWARDED_FOR='203.0.113.99').status_code == 429
+
+
+@pytest.mark.django_db
+def test_ip_tras_proxy_de_confianza(test_user, rates, settings):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+    # El proxy añade la IP real al final; lo que ponga el cliente delante no cuenta
+    for i in range(5):
+        login(email=f'nadie{i}@gmail.com', password='x', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}, 192.0.2.7')
+    assert login(HTTP_X_FORWARDED_FOR='198.51.100.99, 192.0.2.7').status_code == 429
+    assert login(HTTP_X_FORWARDED_FOR='192.0.2.8').status_code == 200
+
+
+@pytest.mark.django_db
+def test_limite_en_login_async(test_user, rates):
+    client = AsyncClient()
+    post = async_to_sync(client.post)
+    body = {'email': 'throttle@gmail.com', 'password': 'incorrecta'}
+    for _ in range(3):
+        assert post('/api/async/token/', body, content_type='application/json').status_code == 401
+    response = post('/api/async/token/', body, content_type='application/json')
+    assert response.status_code == 429
+    assert 'Retry-After' in response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("content_type, body, status", [
+    ('application/x-www-form-urlencoded', 'email=throttle%40gmail.com&password=x', 415),
+    ('text/plain', '{"email": "throttle@gmail.com", "password": "x"}', 415),
+    ('application/json', '{"email": ', 400),
+])
+def test_login_async_cuerpo_no_json_es_4xx(test_user, content_type, body, status):
+    response = async_to_sync(AsyncClient().post)('/api/async/token/', body, content_type=content_type)
+    assert response.status_code == status
@@ -0,0 +1,72 @@
+import hashlib
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from .metrics import record_auth_failure
+from .models import User
+
+# Límites del endpoint de login. SimpleRateThrottle ya es una ventana deslizante
+# (guarda los instantes de cada intento); se comprueba antes de validar las
+# credenciales, así que una ráfaga rechazada no llega a hashear nada.
+
+
+def login_account(data):
+    value = data.get(User.USERNAME_FIELD) if hasattr(data, 'get') else None
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+class LoginRateThrottle(SimpleRateThrottle, ABC):
+    cache = caches['login_throttle']
+
+    @abstractmethod
+    def login_ident(self, request):
+        """Clave del límite para esta petición, o None si no aplica."""
+
+    def allow_request(self, request, view):
+        allowed = super().allow_request(request, view)
+        if not allowed:
+            record_auth_failure('login_throttled')
+        return allowed
+
+    def get_cache_key(self, request, view):
+        ident = self.login_ident(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPRateThrottle(LoginRateThrottle):
+    scope = 'login_ip'
+
+    def login_ident(self, request):
+        return self.get_ident(request)
+
+
+class LoginAccountRateThrottle(LoginRateThrottle):
+    scope = 'login_account'
+
+    def login_ident(self, request):
+        account = login_account(request.data)
+        # Se guarda un hash: la caché no tiene por qué ver los emails
+        return hashlib.sha256(account.encode()).hexdigest() if account else None
+
+
+LOGIN_THROTTLES = (LoginIPRateThrottle, LoginAccountRateThrottle)
+
+
+def login_throttle_wait(request, data):
+    """
+    Para vistas fuera de DRF: segundos a esperar si alguna ventana está llena, si no None.
+    data: cuerpo ya leído por la vista; los throttles no vuelven a parsear la petición.
+    """
+    # Lo único que leen los throttles: META para la IP y data para la cuenta
+    login_request = SimpleNamespace(META=request.META, data=data)
+    waits = []
+    for throttle_class in LOGIN_THROTTLES:
+        throttle = throttle_class()
+        if not throttle.allow_request(login_request, None):
+            waits.append(throttle.wait())
+    return max(waits) if waits else None
@@ -3,10 +3,8 @@ from .views import PasswordEntryViewSet, UserViewSet, CustomTokenObtainPairView
 
 from django.urls import path, include
 from .views import UserViewSet, PasswordEntryViewSet
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from . import async_views
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -17,7 +15,11 @@ router.register(r'passwords', PasswordEntryViewSet, basename='passwordentry')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('async/passwords/', async_views.entry_list, name='async-passwordentry-list'),
+    path('async/passwords/<int:pk>/', async_views.entry_detail, name='async-passwordentry-detail'),
+    path('async/token/', async_views.token_obtain, name='async-token-obtain'),
+    path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    # Ruta antigua, se mantiene para clientes existentes: misma vista
+    path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair_legacy'),
 ]
@@ -1,10 +1,163 @@
-from cryptography.fernet import Fernet
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from cryptography.fernet import InvalidToken
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .ciphers import make_cipher
+from .profiling import timed_crypto
+
+
+# Claves versionadas (settings.FERNET_KEYS): la primera cifra, todas descifran.
+# Cada fila guarda el id de la clave con la que se cifró.
+class KeyRing:
+    def __init__(self, keys):
+        self.primary_id = keys[0][0]
+        self.ciphers = {key_id: make_cipher(key) for key_id, key in keys}
+        self.primary = self.ciphers[self.primary_id]
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self.primary.encrypt(data)
+
+    def decrypt(self, token, key_id=None) -> bytes:
+        cipher = self.ciphers.get(key_id)
+        if cipher is not None:
+            try:
+                return cipher.decrypt(token)
+            except InvalidToken:
+                pass  # id reasignado a otra clave: se prueban todas
+        for other in self.ciphers.values():
+            if other is cipher:
+                continue
+            try:
+                return other.decrypt(token)
+            except InvalidToken:
+                pass
+        raise InvalidToken
+
+    def rotate(self, token) -> bytes:
+        return self.encrypt(self.decrypt(token))
+
+
+keyring = KeyRing(settings.FERNET_KEYS)
+
+_executor = None
+
+
+@receiver(setting_changed)
+def _reload_keyring(setting, **kwargs):
+    global keyring
+    if setting in ('FERNET_KEY', 'FERNET_KEYS', 'PASSWORD_CIPHER_BACKEND'):
+        keyring = KeyRing(settings.FERNET_KEYS)
+
+
+def current_key_id() -> str:
+    return keyring.primary_id
+
+# Los tokens son bytes (BinaryField); al descifrar se aceptan también memoryview
+@timed_crypto
+def encrypt_password(plain_text_password: str, data_key=None) -> bytes:
+    return (data_key or keyring).encrypt(plain_text_password.encode())
+
+@timed_crypto
+def decrypt_password(encrypted_password, key_id=None) -> str:
+    return keyring.decrypt(encrypted_password, key_id).decode()
+
+
+def crypto_workers() -> int:
+    return settings.CRYPTO_MAX_WORKERS or os.cpu_count() or 4
+
+def get_crypto_executor() -> ThreadPoolExecutor:
+    # Pool compartido y acotado; se crea solo la primera vez que se necesita
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=crypto_workers(), thread_name_prefix='crypto')
+    return _executor
+
+
+def _encrypt_chunk(passwords, data_key=None):
+    encrypt = (data_key or keyring).encrypt
+    return [encrypt(password.encode()) for password in passwords]
+
+def _decrypt_chunk(items):
+    # items: (token, key_id, data_key); data_key es la DEK del usuario si la fila la usa
+    decrypt = keyring.decrypt
+    return [
+        (data_key.decrypt(token) if data_key else decrypt(token, key_id)).decode()
+        for token, key_id, data_key in items
+    ]
+
+def _rotate_chunk(tokens):
+    rotate = keyring.rotate
+    return [rotate(token) for token in tokens]
+
+
+def _run_batch(func, items):
+    items = list(items)
+    if len(items) < settings.CRYPTO_PARALLEL_THRESHOLD:
+        return func(items)
+
+    # Un bloque por hilo: el primitivo de cryptography libera el GIL
+    size = -(-len(items) // crypto_workers())
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    results = []
+    for chunk_result in get_crypto_executor().map(func, chunks):
+        results.extend(chunk_result)
+    return results
+
+
+def _decrypt_items(encrypted_passwords, key_ids, data_keys):
+    encrypted_passwords = list(encrypted_passwords)
+    none = [None] * len(encrypted_passwords)
+    return zip(encrypted_passwords, key_ids or none, data_keys or none)
+
+
+@timed_crypto
+def encrypt_many(plain_text_passwords, data_key=None) -> list[bytes]:
+    return _run_batch(partial(_encrypt_chunk, data_key=data_key), plain_text_passwords)
+
+@timed_crypto
+def decrypt_many(encrypted_passwords, key_ids=None, data_keys=None) -> list[str]:
+    return _run_batch(_decrypt_chunk, _decrypt_items(encrypted_passwords, key_ids, data_keys))
+
+@timed_crypto
+def rotate_many(encrypted_passwords) -> list[bytes]:
+    """Re-cifra con la clave activa tokens cifrados con cualquier clave del llavero."""
+    return _run_batch(_rotate_chunk, encrypted_passwords)
+
+
+async def _arun_batch(func, items):
+    # Versión async: el cifrado corre en el pool acotado y el event loop queda libre
+    items = list(items)
+    loop = asyncio.get_running_loop()
+    executor = get_crypto_executor()
+    if len(items) < settings.CRYPTO_PARALLEL_THRESHOLD:
+        return await loop.run_in_executor(executor, func, items)
+
+    size = -(-len(items) // crypto_workers())
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    results = []
+    for chunk_result in await asyncio.gather(*(loop.run_in_executor(executor, func, c) for c in chunks)):
+        results.extend(chunk_result)
+    return results
+
+
+@timed_crypto
+async def aencrypt_many(plain_text_passwords, data_key=None) -> list[bytes]:
+    return await _arun_batch(partial(_encrypt_chunk, data_key=data_key), plain_text_passwords)
 
-fernet = Fernet(settings.FERNET_KEY.encode())
+@timed_crypto
+async def adecrypt_many(encrypted_passwords, key_ids=None, data_keys=None) -> list[str]:
+    return await _arun_batch(_decrypt_chunk, _decrypt_items(encrypted_passwords, key_ids, data_keys))
 
-def encrypt_password(plain_text_password: str) -> str:
-    return fernet.encrypt(plain_text_password.encode()).decode()
 
-def decrypt_password(encrypted_password: str) -> str:
-    return fernet.decrypt(encrypted_password.encode()).decode()
+def chunked(iterable, size):
+    """Agrupa un iterable en listas de hasta `size` elementos sin materializarlo."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
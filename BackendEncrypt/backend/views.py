@@ -1,13 +1,32 @@
-from rest_framework import viewsets
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from .models import PasswordEntry, User
-from .serializer import PasswordEntrySerializer, UserSerializer, CustomTokenObtainPairSerializer
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .bulk import apply_operations
+from .cache import decrypt_entries
+from .conditional import make_etag, not_modified, set_validators
+from .domains import registrable_domain
+from .export import stream_json, stream_ndjson
+from .models import DeletedPasswordEntry, PasswordEntry, User
+from .pagination import PasswordEntryCursorPagination
+from .search import search_entries
+from .sync import changes_page, issue_cursor, new_sync_state, read_cursor, read_watermark, tombstone_horizon
+from .throttling import LOGIN_THROTTLES
+from .serializer import (
+    PasswordEntrySerializer, PasswordEntryMetadataSerializer, PasswordRevealSerializer, PasswordBulkSerializer,
+    PasswordSearchSerializer, PasswordAutofillSerializer, PasswordChangesSerializer,
+    UserSerializer, CustomTokenObtainPairSerializer,
+)
 
 from .serializer import *
 
 # Vista para gestionar usuarios
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    # Solo las columnas que expone UserSerializer (sin hash ni DEK envuelta)
+    queryset = User.objects.only('id', 'email', 'username', 'created_at').order_by('id')
     serializer_class = UserSerializer
 
 # Vista para gestionar entradas de contraseñas
@@ -25,17 +44,160 @@ class UserViewSet(viewsets.ModelViewSet):
 class PasswordEntryViewSet(viewsets.ModelViewSet):
     serializer_class = PasswordEntrySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PasswordEntryCursorPagination
     queryset = PasswordEntry.objects.none()  # evita mostrar datos de otros usuarios
 
     def get_queryset(self):
-        return PasswordEntry.objects.filter(user=self.request.user)
+        # request.user viene de los claims del JWT: se filtra por id, sin cargar el User
+        return PasswordEntry.objects.filter(user_id=self.request.user.pk)
+
+    def get_serializer_class(self):
+        # ?mode=metadata devuelve solo metadatos, sin descifrar contraseñas
+        if self.action in ('list', 'retrieve', 'changes') and self.request.query_params.get('mode') == 'metadata':
+            return PasswordEntryMetadataSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.pk)
+
+    # GET condicional: el estado de la bóveda sale de un agregado, sin leer filas.
+    # Si no cambió, 304 sin descifrar ni serializar nada.
+    def list(self, request, *args, **kwargs):
+        state = self.get_queryset().aggregate(last_modified=Max('updated_at'), count=Count('id'))
+        # Un borrado también modifica la bóveda: cuenta la última lápida
+        last_deleted = DeletedPasswordEntry.objects.filter(user_id=request.user.pk).aggregate(
+            last_deleted=Max('deleted_at')
+        )['last_deleted']
+        last_modified = max(filter(None, (state['last_modified'], last_deleted)), default=None)
+        etag = make_etag('list', request.user.pk, last_modified, state['count'], request.get_full_path())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            last_modified = self.get_queryset().filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            last_modified = None
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)  # 404 normal
+        etag = make_etag('detail', kwargs['pk'], last_modified, request.get_full_path())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    # Descifra bajo demanda una sola entrada
+    @action(detail=True, methods=['get'])
+    def reveal(self, request, pk=None):
+        entry = self.get_object()
+        return Response({'id': entry.id, 'decrypted_password': entry.get_password()})
+
+    # Descifra solo los ids pedidos; los que no son del usuario se ignoran
+    @action(detail=False, methods=['post'], url_path='reveal')
+    def reveal_batch(self, request):
+        serializer = PasswordRevealSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entries = list(
+            self.get_queryset().filter(id__in=serializer.validated_data['ids']).only('id', 'user', 'encrypted_pass', 'key_id', 'updated_at')
+        )
+        plain = decrypt_entries(entries)
+        return Response({
+            'results': [
+                {'id': entry.id, 'decrypted_password': password}
+                for entry, password in zip(entries, plain)
+            ]
+        })
+
+    # Búsqueda ordenada por relevancia en title/username/service_url; solo metadatos
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        params = PasswordSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        entries = search_entries(request.user.pk, params.validated_data['q'], params.validated_data['limit'])
+        return Response({'results': PasswordEntryMetadataSerializer(entries, many=True).data})
+
+    # Entradas que corresponden al sitio ?url=: igualdad indexada sobre (user, service_domain)
+    @action(detail=False, methods=['get'])
+    def autofill(self, request):
+        params = PasswordAutofillSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        domain = registrable_domain(params.validated_data['url'])
+        if not domain:
+            return Response({'url': ['Enter a valid URL.']}, status=status.HTTP_400_BAD_REQUEST)
+        entries = self.get_queryset().filter(service_domain=domain).order_by('-updated_at', '-id')[:params.validated_data['limit']]
+        return Response({
+            'domain': domain,
+            'results': PasswordEntryMetadataSerializer(entries, many=True).data,
+        })
+
+    # Sincronización incremental: cambios y borrados desde la marca de agua ?since=,
+    # por páginas; se sigue `next` hasta que es null y se guarda `watermark`
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        params = PasswordChangesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        if 'cursor' in params.validated_data:
+            try:
+                state = read_cursor(params.validated_data['cursor'])
+            except ValueError:
+                return Response({'cursor': ['Invalid cursor.']}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            since = params.validated_data.get('since')
+            try:
+                since = read_watermark(since) if since else None
+            except ValueError:
+                return Response({'since': ['Invalid watermark.']}, status=status.HTTP_400_BAD_REQUEST)
+            # Las lápidas anteriores pueden estar purgadas: no se puede dar un delta completo
+            if since is not None and since < tombstone_horizon():
+                return Response(
+                    {'since': ['Watermark is too old, sync again without since.']}, status=status.HTTP_410_GONE
+                )
+            state = new_sync_state(since)
+
+        changed, deleted, following = changes_page(
+            self.get_queryset(), request.user.pk, state, params.validated_data['page_size']
+        )
+        next_url = None
+        if following is not None:
+            next_url = remove_query_param(
+                replace_query_param(request.build_absolute_uri(), 'cursor', issue_cursor(following)), 'since'
+            )
+        return Response({
+            'watermark': state['watermark'],
+            'next': next_url,
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+        })
+
+    # Varias operaciones create/update/delete en una sola petición y transacción
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = PasswordBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ok, results = apply_operations(request.user.pk, serializer.validated_data['operations'])
+        return Response(
+            {'results': results},
+            status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Exporta la bóveda completa en streaming (?output=ndjson por defecto, o json)
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        if request.query_params.get('output') == 'json':
+            stream, content_type, extension = stream_json, 'application/json', 'json'
+        else:
+            stream, content_type, extension = stream_ndjson, 'application/x-ndjson', 'ndjson'
+        response = StreamingHttpResponse(stream(self.get_queryset()), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="vault.{extension}"'
+        return response
 
 
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+# Único emisor de tokens: todos llevan los claims de CustomTokenObtainPairSerializer
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = LOGIN_THROTTLES
 
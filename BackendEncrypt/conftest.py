@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+# Puerta de regresión de los benchmarks. Se guarda una referencia con
+#     pytest --benchmark-only --benchmark-autosave
+# y luego cada cambio se compara contra la última guardada (o BENCHMARK_BASELINE=0007):
+#     BENCHMARK_MAX_REGRESSION=10 pytest --benchmark-only
+# falla si la mediana de algún benchmark empeora más de un 10 %. Es lo mismo que
+# --benchmark-compare --benchmark-compare-fail=median:10%, que tiene prioridad si se pasa.
+# Sin referencia guardada la puerta no puede comparar nada, así que la sesión falla.
+
+
+def pytest_configure(config):
+    threshold = os.getenv("BENCHMARK_MAX_REGRESSION")
+    if not threshold or config.getoption("benchmark_compare_fail"):
+        return
+    config.option.benchmark_compare = os.getenv("BENCHMARK_BASELINE") or True
+    config.option.benchmark_compare_fail = [parse_compare_fail(f"median:{threshold}%")]
+
+
+def pytest_sessionstart(session):
+    # pytest-benchmark carga la referencia en su pytest_configure (trylast); aquí ya está
+    benchmarksession = getattr(session.config, '_benchmarksession', None)
+    if not os.getenv("BENCHMARK_MAX_REGRESSION") or benchmarksession is None or benchmarksession.disabled:
+        return
+    if not benchmarksession.compared_mapping:
+        raise pytest.UsageError(
+            f"BENCHMARK_MAX_REGRESSION está definido pero no hay referencia en {benchmarksession.storage}"
+            + (f" que coincida con {os.environ['BENCHMARK_BASELINE']!r}" if os.getenv("BENCHMARK_BASELINE") else "")
+            + "; guárdala antes con --benchmark-autosave"
+        )
@@ -4,10 +4,8 @@ import numpy as np
 import psutil
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor
-import gc
-import random
-import string
+
+from loadtest import LoadTestConfig, describe, print_report, run_load_test, write_csv
 
 class MemoryMonitor:
     """Monitor de uso de memoria en tiempo real"""
@@ -39,159 +37,54 @@ class MemoryMonitor:
         if hasattr(self, 'thread'):
             self.thread.join()
 
-def simulate_crud_operations(num_operations=1000):
-    """Simular operaciones CRUD con medición de rendimiento"""
-    
-    # Simulación de datos
-    passwords_db = {}
-    
-    def generate_password():
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=12))
-    
-    def create_entry():
-        id = len(passwords_db) + 1
-        passwords_db[id] = {
-            'username': f'user_{id}',
-            'password': generate_password(),
-            'url': f'https://site{id}.com'
-        }
-        return id
-    
-    def read_entry(id):
-        return passwords_db.get(id)
-    
-    def update_entry(id):
-        if id in passwords_db:
-            passwords_db[id]['password'] = generate_password()
-            return True
-        return False
-    
-    def delete_entry(id):
-        if id in passwords_db:
-            del passwords_db[id]
-            return True
-        return False
-    
-    # Medición de operaciones CRUD
-    results = {
-        'CREATE': {'times': [], 'memory': []},
-        'READ': {'times': [], 'memory': []},
-        'UPDATE': {'times': [], 'memory': []},
-        'DELETE': {'times': [], 'memory': []}
+def run_crud_operations(num_operations=200, server='wsgi'):
+    """Operaciones CRUD contra la API real (loadtest.py), una fase por operación"""
+    # READ descifra una entrada concreta, como read_entry(id)
+    phases = {
+        'CREATE': ('create', num_operations),
+        'READ': ('reveal', num_operations),
+        'UPDATE': ('update', num_operations // 2),
+        'DELETE': ('delete', num_operations // 4),
     }
-    
+    results = {}
     monitor = MemoryMonitor()
-    
-    print("Ejecutando simulación de operaciones CRUD...")
-    
-    # CREATE
-    monitor.start_monitoring()
-    start_time = time.time()
-    
-    for i in range(num_operations):
-        op_start = time.time()
-        create_entry()
-        op_time = time.time() - op_start
-        results['CREATE']['times'].append(op_time * 1000)  # convertir a ms
-    
-    monitor.stop_monitoring()
-    results['CREATE']['memory'] = monitor.memory_usage.copy()
-    
-    # READ
-    monitor.start_monitoring()
-    ids = list(passwords_db.keys())
-    
-    for i in range(min(num_operations, len(ids))):
-        op_start = time.time()
-        read_entry(random.choice(ids))
-        op_time = time.time() - op_start
-        results['READ']['times'].append(op_time * 1000)
-    
-    monitor.stop_monitoring()
-    results['READ']['memory'] = monitor.memory_usage.copy()
-    
-    # UPDATE
-    monitor.start_monitoring()
-    
-    for i in range(min(num_operations//2, len(ids))):
-        op_start = time.time()
-        update_entry(random.choice(ids))
-        op_time = time.time() - op_start
-        results['UPDATE']['times'].append(op_time * 1000)
-    
-    monitor.stop_monitoring()
-    results['UPDATE']['memory'] = monitor.memory_usage.copy()
-    
-    # DELETE
-    monitor.start_monitoring()
-    delete_ids = random.sample(ids, min(num_operations//4, len(ids)))
-    
-    for id in delete_ids:
-        op_start = time.time()
-        delete_entry(id)
-        op_time = time.time() - op_start
-        results['DELETE']['times'].append(op_time * 1000)
-    
-    monitor.stop_monitoring()
-    results['DELETE']['memory'] = monitor.memory_usage.copy()
-    
+
+    print(f"Ejecutando operaciones CRUD contra la API ({server.upper()})...")
+
+    for label, (operation, count) in phases.items():
+        config = LoadTestConfig(server=server, workers=1, requests=count,
+                                mix={operation: 1}, vault_sizes={num_operations: 1})
+        monitor.start_monitoring()
+        result = run_load_test(config)
+        monitor.stop_monitoring()
+        results[label] = {
+            'times': [t * 1000 for t in result.samples.get(operation, [])],  # convertir a ms
+            'memory': monitor.memory_usage.copy(),
+        }
+
     return results
 
-def simulate_load_test(concurrent_users=10, operations_per_user=100):
-    """Simular carga con múltiples usuarios concurrentes"""
-    passwords_db = {}
-    lock = threading.Lock()
-    
-    def user_operations():
-        times = []
-        for _ in range(operations_per_user):
-            # Operación aleatoria
-            operation = random.choice(['CREATE', 'READ', 'UPDATE'])
-            
-            start_time = time.time()
-            
-            if operation == 'CREATE':
-                with lock:
-                    id = len(passwords_db) + 1
-                    passwords_db[id] = {'user': f'user_{id}', 'pass': 'secret123'}
-            
-            elif operation == 'READ' and passwords_db:
-                with lock:
-                    random.choice(list(passwords_db.values()))
-            
-            elif operation == 'UPDATE' and passwords_db:
-                with lock:
-                    id = random.choice(list(passwords_db.keys()))
-                    passwords_db[id]['pass'] = 'updated_pass'
-            
-            op_time = (time.time() - start_time) * 1000
-            times.append(op_time)
-        
-        return times
-    
-    # Monitor de memoria durante la carga
+def run_mixed_load_test(concurrent_users=10, operations_per_user=100, server='wsgi'):
+    """Carga mixta (list/reveal/create/update/delete/login) con usuarios concurrentes contra la API real"""
     monitor = MemoryMonitor()
     monitor.start_monitoring()
-    
-    print(f"Ejecutando prueba de carga: {concurrent_users} usuarios concurrentes...")
-    
-    start_time = time.time()
-    
-    with ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-        futures = [executor.submit(user_operations) for _ in range(concurrent_users)]
-        all_times = []
-        for future in futures:
-            all_times.extend(future.result())
-    
-    total_time = time.time() - start_time
+
+    print(f"Ejecutando prueba de carga: {concurrent_users} usuarios concurrentes ({server.upper()})...")
+
+    result = run_load_test(LoadTestConfig(server=server, workers=concurrent_users, requests=operations_per_user))
     monitor.stop_monitoring()
-    
+    print_report(result)
+    write_csv(result, 'benchmark_carga.csv')
+
+    mixed = describe(result.all_samples())
     return {
-        'response_times': all_times,
+        'response_times': [t * 1000 for t in result.all_samples()],
         'memory_usage': monitor.memory_usage,
         'memory_timestamps': monitor.timestamps,
-        'total_time': total_time,
-        'throughput': len(all_times) / total_time
+        'total_time': result.elapsed,
+        'throughput': result.throughput,
+        'p95': mixed['p95'] * 1000,
+        'p99': mixed['p99'] * 1000,
     }
 
 def analyze_csv_data():
@@ -221,9 +114,9 @@ def create_comprehensive_analysis():
     # Analizar datos CSV existentes
     csv_data = analyze_csv_data()
     
-    # Ejecutar simulaciones
-    crud_results = simulate_crud_operations(500)
-    load_test_results = simulate_load_test(5, 50)
+    # Ejecutar pruebas contra la API
+    crud_results = run_crud_operations(200)
+    load_test_results = run_mixed_load_test(5, 50)
     
     # Crear visualización
     fig = plt.figure(figsize=(16, 12))
@@ -244,12 +137,12 @@ def create_comprehensive_analysis():
             ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
                     f'{value:.3f}', ha='center', va='bottom', fontsize=8)
     
-    # 2. Simulación CRUD - Velocidad
+    # 2. CRUD contra la API - Velocidad
     ax2 = plt.subplot(2, 3, 2)
     crud_times = {op: np.mean(data['times']) for op, data in crud_results.items()}
     bars2 = ax2.bar(crud_times.keys(), crud_times.values(), 
                    color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'], alpha=0.8)
-    ax2.set_title('Simulación CRUD - Velocidad')
+    ax2.set_title('CRUD contra la API - Velocidad')
     ax2.set_ylabel('Tiempo Promedio (ms)')
     
     for bar, value in zip(bars2, crud_times.values()):
@@ -273,7 +166,7 @@ def create_comprehensive_analysis():
     # 4. Distribución de tiempos de respuesta bajo carga
     ax4 = plt.subplot(2, 3, 4)
     ax4.hist(load_test_results['response_times'], bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-    ax4.set_title('Distribución Tiempos - Carga Simulada')
+    ax4.set_title('Distribución Tiempos - Carga Mixta')
     ax4.set_xlabel('Tiempo de Respuesta (ms)')
     ax4.set_ylabel('Frecuencia')
     
@@ -294,7 +187,7 @@ def create_comprehensive_analysis():
     # Estadísticas de resumen
     stats_text = f"""RESUMEN DE RENDIMIENTO
     
-Simulación CRUD:
+CRUD (API real):
 • CREATE: {np.mean(crud_results['CREATE']['times']):.3f} ms
 • READ: {np.mean(crud_results['READ']['times']):.3f} ms  
 • UPDATE: {np.mean(crud_results['UPDATE']['times']):.3f} ms
@@ -303,6 +196,7 @@ Simulación CRUD:
 Prueba de Carga:
 • Throughput: {load_test_results['throughput']:.0f} ops/seg
 • Tiempo promedio: {np.mean(load_test_results['response_times']):.3f} ms
+• p95 / p99: {load_test_results['p95']:.1f} / {load_test_results['p99']:.1f} ms
 • Memoria máxima: {max(load_test_results['memory_usage']) if load_test_results['memory_usage'] else 0:.1f} MB
 
 Datos CSV:
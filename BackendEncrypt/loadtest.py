@@ -0,0 +1,391 @@
+"""
+Prueba de carga de extremo a extremo contra la API real.
+
+Arranca la aplicación Django en el propio proceso, como WSGI (django.test.Client)
+o como ASGI (AsyncClient), sobre una base de datos local propia; crea un usuario
+por worker con una bóveda de tamaño sorteado y lanza una mezcla configurable de
+operaciones desde un pool de hilos (WSGI) o tareas asyncio (ASGI). Informa del
+throughput y de los percentiles p50/p95/p99 y escribe el CSV con el mismo
+esquema que benchmark_resultados*.csv, así grafica*.py lo pueden dibujar.
+
+    python loadtest.py --server wsgi --workers 8 --requests 200
+    python loadtest.py --server asgi --mix list=50,reveal=30,create=10,login=10 --vault-sizes 10:3,1000:1
+
+En modo ASGI se llama a las vistas async nativas (/async/...), que es lo que sirve
+un despliegue ASGI. Con DB_ENGINE=postgresql se usa la base de datos configurada
+en el entorno; los usuarios load-* que crea la prueba se borran al terminar.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+DEFAULT_MIX = {'list': 40, 'reveal': 25, 'create': 15, 'update': 10, 'delete': 5, 'login': 5}
+DEFAULT_VAULT_SIZES = {10: 6, 100: 3, 1000: 1}
+CSV_FIELDS = ['name', 'min', 'max', 'mean', 'stddev', 'median', 'iqr', 'outliers', 'ops', 'rounds', 'iterations']
+
+PASSWORD = 'loadtest-200211'
+EXPECTED_STATUS = {'list': 200, 'reveal': 200, 'create': 201, 'update': 200, 'delete': 204, 'login': 200}
+SEED_BATCH = 5000
+
+# Nombres de URL por servidor: en ASGI, reveal es el GET del detalle async (con la contraseña)
+ROUTES = {
+    'wsgi': {
+        'list': 'passwordentry-list', 'reveal': 'passwordentry-reveal',
+        'detail': 'passwordentry-detail', 'login': 'token_obtain_pair',
+    },
+    'asgi': {
+        'list': 'async-passwordentry-list', 'reveal': 'async-passwordentry-detail',
+        'detail': 'async-passwordentry-detail', 'login': 'async-token-obtain',
+    },
+}
+
+
+@dataclass
+class LoadTestConfig:
+    server: str = 'wsgi'
+    workers: int = 4
+    requests: int = 100  # por worker; se ignora si hay duration
+    duration: float = None  # segundos
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+    vault_sizes: dict = field(default_factory=lambda: dict(DEFAULT_VAULT_SIZES))
+    password_length: int = 16
+    seed: int = None
+
+
+@dataclass
+class Vault:
+    email: str
+    entry_ids: list
+    token: str = None
+
+
+@dataclass
+class LoadTestResult:
+    server: str
+    workers: int
+    elapsed: float
+    samples: dict  # operación -> [segundos]
+    errors: dict  # operación -> nº de respuestas inesperadas
+
+    @property
+    def total(self):
+        return sum(len(values) for values in self.samples.values())
+
+    @property
+    def throughput(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def all_samples(self):
+        return [value for values in self.samples.values() for value in values]
+
+
+def setup_django(db_path=None):
+    """Configura Django sobre una base de datos de prueba y aplica las migraciones."""
+    from django.apps import apps
+    if apps.ready:
+        return
+    # La prueba nunca escribe en el db.sqlite3 de desarrollo
+    os.environ['SQLITE_PATH'] = db_path or os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'loadtest.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'BackendEncrypt.settings')
+    # El login también se mide: los límites por IP y cuenta no deben cortar la prueba
+    os.environ.setdefault('LOGIN_RATE_PER_IP', '1000000/min')
+    os.environ.setdefault('LOGIN_RATE_PER_ACCOUNT', '1000000/min')
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+    django.setup()
+    # Host que envían Client y AsyncClient
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    call_command('migrate', verbosity=0)
+
+
+def random_secret(rng, length):
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
+
+def create_vaults(count, vault_sizes, password_length=16, rng=None):
+    """Un usuario por worker; el tamaño de cada bóveda se sortea con los pesos de vault_sizes."""
+    from django.contrib.auth import get_user_model
+    from backend.bulk import bulk_create_entries
+
+    User = get_user_model()
+    rng = rng or random.Random()
+    run = uuid.uuid4().hex[:8]  # varias ejecuciones pueden compartir base de datos
+    vaults = []
+    for i in range(count):
+        size = rng.choices(list(vault_sizes), weights=list(vault_sizes.values()))[0]
+        email = f'load-{run}-{i}@example.com'
+        user = User.objects.create_user(username=f'load-{run}-{i}', email=email, password=PASSWORD)
+        entry_ids = []
+        for start in range(0, size, SEED_BATCH):
+            rows = [
+                {
+                    'title': f'Entry {n}',
+                    'username': f'user{n}',
+                    'service_url': f'https://site{n}.example.com',
+                    'raw_password': random_secret(rng, password_length),
+                }
+                for n in range(start, min(start + SEED_BATCH, size))
+            ]
+            entry_ids.extend(entry.id for entry in bulk_create_entries(user.id, rows))
+        vaults.append(Vault(email, entry_ids))
+    return vaults
+
+
+def delete_vaults(vaults):
+    """Borra los usuarios de la prueba y, en cascada, sus entradas."""
+    from django.contrib.auth import get_user_model
+
+    get_user_model().objects.filter(email__in=[vault.email for vault in vaults]).delete()
+
+
+def build_request(op, vault, rng, password_length, server='wsgi'):
+    """(operación, método, ruta, cuerpo). Con la bóveda vacía, reveal/update/delete pasan a create."""
+    from django.urls import reverse
+
+    routes = ROUTES[server]
+    if op in ('reveal', 'update', 'delete') and not vault.entry_ids:
+        op = 'create'
+    if op == 'list':
+        return op, 'get', reverse(routes['list']), None
+    if op == 'reveal':
+        return op, 'get', reverse(routes['reveal'], args=[rng.choice(vault.entry_ids)]), None
+    if op == 'create':
+        body = {'title': f'Load {rng.randrange(10 ** 6)}', 'raw_password': random_secret(rng, password_length)}
+        return op, 'post', reverse(routes['list']), body
+    if op == 'update':
+        body = {'raw_password': random_secret(rng, password_length)}
+        return op, 'patch', reverse(routes['detail'], args=[rng.choice(vault.entry_ids)]), body
+    if op == 'delete':
+        entry_id = vault.entry_ids.pop(rng.randrange(len(vault.entry_ids)))
+        return op, 'delete', reverse(routes['detail'], args=[entry_id]), None
+    if op == 'login':
+        return op, 'post', reverse(routes['login']), {'email': vault.email, 'password': PASSWORD}
+    raise ValueError(f'Operación desconocida: {op}')
+
+
+def request_kwargs(vault, body):
+    kwargs = {'headers': {'Authorization': f'Bearer {vault.token}'}} if vault.token else {}
+    if body is not None:
+        kwargs.update(data=json.dumps(body), content_type='application/json')
+    return kwargs
+
+
+def handle_response(op, vault, response):
+    """Actualiza el estado del worker; devuelve False si la respuesta no es la esperada."""
+    if response.status_code != EXPECTED_STATUS[op]:
+        return False
+    if op == 'create':
+        vault.entry_ids.append(response.json()['id'])
+    elif op == 'login':
+        vault.token = response.json()['access']
+    return True
+
+
+def _check_login(vault, response):
+    if not handle_response('login', vault, response):
+        raise RuntimeError(f'Login inicial fallido ({response.status_code}) para {vault.email}')
+
+
+def _operations(config, rng):
+    ops, weights = list(config.mix), list(config.mix.values())
+    if config.duration is None:
+        yield from rng.choices(ops, weights=weights, k=config.requests)
+        return
+    deadline = time.perf_counter() + config.duration
+    while time.perf_counter() < deadline:
+        yield rng.choices(ops, weights=weights)[0]
+
+
+def _run_sync_worker(vault, rng, config):
+    from django.db import connections
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    samples, errors = defaultdict(list), defaultdict(int)
+    try:
+        # El primer login da el token y calienta la conexión; no se mide
+        _, _, path, body = build_request('login', vault, rng, 0, config.server)
+        _check_login(vault, client.post(path, **request_kwargs(vault, body)))
+        for planned in _operations(config, rng):
+            op, method, path, body = build_request(planned, vault, rng, config.password_length, config.server)
+            kwargs = request_kwargs(vault, body)
+            start = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            samples[op].append(time.perf_counter() - start)
+            if not handle_response(op, vault, response):
+                errors[op] += 1
+    finally:
+        connections.close_all()
+    return samples, errors
+
+
+async def _run_async_worker(vault, rng, config):
+    from django.test import AsyncClient
+
+    client = AsyncClient(raise_request_exception=False)
+    samples, errors = defaultdict(list), defaultdict(int)
+    _, _, path, body = build_request('login', vault, rng, 0, config.server)
+    _check_login(vault, await client.post(path, **request_kwargs(vault, body)))
+    for planned in _operations(config, rng):
+        op, method, path, body = build_request(planned, vault, rng, config.password_length, config.server)
+        kwargs = request_kwargs(vault, body)
+        start = time.perf_counter()
+        response = await getattr(client, method)(path, **kwargs)
+        samples[op].append(time.perf_counter() - start)
+        if not handle_response(op, vault, response):
+            errors[op] += 1
+    return samples, errors
+
+
+def run_load_test(config, vaults=None):
+    """Lanza la carga y devuelve las latencias por operación. Borra las bóvedas que crea."""
+    if config.server not in ROUTES:
+        raise ValueError(f'Servidor desconocido: {config.server}')
+    setup_django()
+    rng = random.Random(config.seed)
+    own_vaults = not vaults
+    if own_vaults:
+        vaults = create_vaults(config.workers, config.vault_sizes, config.password_length, rng)
+    rngs = [random.Random(rng.random()) for _ in vaults]
+
+    try:
+        start = time.perf_counter()
+        if config.server == 'asgi':
+            async def run_all():
+                return await asyncio.gather(*(_run_async_worker(v, r, config) for v, r in zip(vaults, rngs)))
+            outcomes = asyncio.run(run_all())
+        else:
+            with ThreadPoolExecutor(max_workers=len(vaults), thread_name_prefix='load') as executor:
+                outcomes = list(executor.map(lambda args: _run_sync_worker(*args, config), zip(vaults, rngs)))
+        elapsed = time.perf_counter() - start
+    finally:
+        # Con DB_ENGINE=postgresql la base de datos no es temporal: no se dejan usuarios load-*
+        if own_vaults:
+            delete_vaults(vaults)
+
+    samples, errors = defaultdict(list), defaultdict(int)
+    for worker_samples, worker_errors in outcomes:
+        for op, values in worker_samples.items():
+            samples[op].extend(values)
+        for op, count in worker_errors.items():
+            errors[op] += count
+    return LoadTestResult(config.server, len(vaults), elapsed, dict(samples), dict(errors))
+
+
+def percentile(sorted_values, q):
+    # Interpolación lineal entre rangos, igual que numpy.percentile
+    position = (len(sorted_values) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def describe(values):
+    """Estadísticas de una serie de latencias, con los mismos nombres que pytest-benchmark."""
+    values = sorted(values)
+    mean = statistics.fmean(values)
+    stddev = statistics.stdev(values) if len(values) > 1 else 0.0
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    iqr = q3 - q1
+    stddev_outliers = sum(1 for v in values if abs(v - mean) > stddev)
+    iqr_outliers = sum(1 for v in values if v < q1 - 1.5 * iqr or v > q3 + 1.5 * iqr)
+    return {
+        'min': values[0],
+        'max': values[-1],
+        'mean': mean,
+        'stddev': stddev,
+        'median': percentile(values, 50),
+        'iqr': iqr,
+        'outliers': f'{stddev_outliers};{iqr_outliers}',
+        'ops': 1 / mean if mean else 0.0,
+        'rounds': len(values),
+        'iterations': 1,
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+    }
+
+
+def summary_rows(result):
+    """Filas por operación más la mezcla completa ('mixed')."""
+    rows = {op: describe(values) for op, values in sorted(result.samples.items()) if values}
+    if result.total:
+        rows['mixed'] = describe(result.all_samples())
+    return rows
+
+
+def write_csv(result, path):
+    """Escribe el resumen en el esquema de benchmark_resultados*.csv (name = loadtest.py::<servidor>_<operación>)."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for op, stats in summary_rows(result).items():
+            writer.writerow({'name': f'loadtest.py::{result.server}_{op}', **stats})
+
+
+def print_report(result):
+    print(f"\nServidor {result.server.upper()}: {result.workers} workers, {result.total} peticiones "
+          f"en {result.elapsed:.2f} s -> {result.throughput:.1f} req/s")
+    print(f"{'operación':<10} {'peticiones':>10} {'errores':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for op, stats in summary_rows(result).items():
+        errors = sum(result.errors.values()) if op == 'mixed' else result.errors.get(op, 0)
+        print(f"{op:<10} {stats['rounds']:>10} {errors:>8} {stats['median'] * 1000:>9.2f} "
+              f"{stats['p95'] * 1000:>9.2f} {stats['p99'] * 1000:>9.2f}")
+
+
+def parse_weights(text, key=str):
+    """'list=40,reveal=25' o '10:6,1000:1' -> {clave: peso}."""
+    weights = {}
+    for item in filter(None, text.split(',')):
+        name, _, weight = item.replace(':', '=').partition('=')
+        weights[key(name.strip())] = float(weight or 1)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prueba de carga de extremo a extremo contra la API.')
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--workers', type=int, default=4, help='hilos (WSGI) o tareas (ASGI) concurrentes')
+    parser.add_argument('--requests', type=int, default=100, help='peticiones por worker')
+    parser.add_argument('--duration', type=float, help='segundos de carga; sustituye a --requests')
+    parser.add_argument('--mix', default=','.join(f'{op}={w}' for op, w in DEFAULT_MIX.items()),
+                        help='pesos por operación: ' + ', '.join(DEFAULT_MIX))
+    parser.add_argument('--vault-sizes', default=','.join(f'{s}:{w}' for s, w in DEFAULT_VAULT_SIZES.items()),
+                        help='tamaño:peso de las bóvedas, p. ej. 10:6,100:3,1000:1')
+    parser.add_argument('--password-length', type=int, default=16)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--db', help='fichero SQLite (por defecto uno temporal)')
+    parser.add_argument('--csv', default='benchmark_carga.csv', help='fichero de resultados')
+    args = parser.parse_args(argv)
+
+    mix = parse_weights(args.mix)
+    unknown = set(mix) - set(EXPECTED_STATUS)
+    if unknown:
+        parser.error(f"operaciones desconocidas: {', '.join(sorted(unknown))}")
+
+    setup_django(args.db)
+    config = LoadTestConfig(
+        server=args.server, workers=args.workers, requests=args.requests, duration=args.duration,
+        mix=mix, vault_sizes=parse_weights(args.vault_sizes, int),
+        password_length=args.password_length, seed=args.seed,
+    )
+    result = run_load_test(config)
+    print_report(result)
+    write_csv(result, args.csv)
+    print(f"\nResultados guardados en {args.csv}")
+
+
+if __name__ == '__main__':
+    main()